@@ -0,0 +1,48 @@
+import argparse
+
+from data.classes.Benchmark import MAX_SLOWDOWN, SUITE, compare, load, run, save
+from data.classes.Tournament import discover_bots
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bots", type=str, nargs="*", default=None, help="Bot modules to benchmark (default: every bot in data/classes/bots)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed set before every move, for the bots' random tie-breaks")
+    parser.add_argument("--depth", type=int, default=None, help="Search to this depth without a time limit, for bots that have one")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per position, the fastest one is kept")
+    parser.add_argument("--output", type=str, default=None, help="Write the results as JSON to this file")
+    parser.add_argument("--baseline", type=str, default=None, help="JSON results of an earlier run to compare against")
+    parser.add_argument("--max-slowdown", type=float, default=MAX_SLOWDOWN, help="Fraction a bot may get slower than the baseline")
+    parser.add_argument("--fail-on-change", action="store_true", help="Also fail when moves, nodes or depths differ from the baseline")
+    args = parser.parse_args()
+
+    names = args.bots or discover_bots()
+    report = run(names, SUITE, args.seed, args.depth, args.repeat)
+
+    print(f"{'bot':<16} {'position':<16} {'move':<18} {'seconds':>8} {'nodes':>9} {'nodes/s':>9} {'depth':>5}")
+    for result in report["results"]:
+        move = str(tuple(tuple(square) for square in result["move"])) if result["move"] else "-"
+        nodes = result["nodes"] if result["nodes"] is not None else "-"
+        nps = f"{result['nps']:.0f}" if result["nps"] is not None else "-"
+        depth = result["depth"] if result["depth"] is not None else "-"
+        print(f"{result['bot']:<16} {result['position']:<16} {move:<18} {result['seconds']:>8.4f} {nodes:>9} {nps:>9} {depth:>5}")
+    print()
+    for name, total in report["totals"].items():
+        nps = f", {total['nps']:.0f} nodes/s" if total["nps"] is not None else ""
+        print(f"{name}: {total['seconds']:.3f}s over {total['positions']} positions{nps}")
+
+    if args.output:
+        save(report, args.output)
+
+    if args.baseline:
+        failing = {"slower", "settings"}
+        if args.fail_on_change:
+            failing.add("different")
+        differences = compare(report, load(args.baseline), args.max_slowdown)
+        print(f"\n=== Compared with {args.baseline} ===")
+        for name, kind, message in differences:
+            print(f"{name:<16} {kind:<10} {message}")
+        if not differences:
+            print("no differences")
+        if any(kind in failing for _, kind, _ in differences):
+            exit(1)
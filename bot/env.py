@@ -7,6 +7,39 @@ import os
 # Add the project root directory to Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from data.classes.Board import Board
+from data.classes.Bitboard import targets
+from data.classes.GameState import POSITIONS
+from data.classes.Encoding import to_obs, from_obs, from_cells
+from observation import NUM_PLANES, PlaneEncoder, decode_planes
+
+# Actions are from_square * 36 + to_square, squares numbered row * 6 + col
+# like the observation. ACTION_MOVES maps an action to the Board move
+# ((x, y), (x, y)), move_to_action goes the other way
+NUM_ACTIONS = 36 * 36
+ACTION_MOVES = [(POSITIONS[action // 36], POSITIONS[action % 36]) for action in range(NUM_ACTIONS)]
+
+
+def move_to_action(move):
+    (fx, fy), (tx, ty) = move
+    return (fy * 6 + fx) * 36 + ty * 6 + tx
+
+
+def action_mask(state, color):
+    """
+    Bool array of NUM_ACTIONS, True for the legal moves of color in the
+    GameState, built from the bitboard generator without making move tuples.
+    """
+    # one NUM_ACTIONS bit integer, unpacked with a single NumPy call
+    bits = 0
+    pieces = state.occupied[color]
+    while pieces:
+        bit = pieces & -pieces
+        pieces ^= bit
+        sq = bit.bit_length() - 1
+        bits |= targets(state, sq) << (sq * 36)
+    packed = np.frombuffer(bits.to_bytes(NUM_ACTIONS // 8, "little"), dtype=np.uint8)
+    return np.unpackbits(packed, bitorder="little").view(bool)
+
 
 class ACMChessEnv(gym.Env):
     """
@@ -18,51 +51,41 @@ class ACMChessEnv(gym.Env):
         "render_fps": 1
     }
 
-    def __init__(self, render_mode=None, width=600, height=600):
+    def __init__(self, render_mode=None, width=600, height=600, obs_mode="board"):
         self.render_mode = render_mode
         self.width = width
         self.height = height
         self.board = Board(width, height)
+        self.board.verbose = False
         self.current_side = 'white'
         self.done = False
         self.spec = None
 
-        # Action: 4 discrete values for (from_row, from_col, to_row, to_col)
-        self.action_space = spaces.MultiDiscrete([6, 6, 6, 6])
+        # Action: from_square * 36 + to_square, see ACTION_MOVES
+        self.action_space = spaces.Discrete(NUM_ACTIONS)
 
-        # Observation: board state encoded as integers [0–17]
-        self.observation_space = spaces.Box(low=0, high=17, shape=(6, 6), dtype=np.uint8)
+        # Observation: board state encoded as integers [0–17], or with
+        # obs_mode "planes" the planes of observation.py. Planes are written
+        # into one buffer, copy an observation to keep it past the next step
+        self.obs_mode = obs_mode
+        if obs_mode == "planes":
+            self._encoder = PlaneEncoder()
+            self.observation_space = spaces.Box(low=0, high=1, shape=(NUM_PLANES, 6, 6), dtype=np.float32)
+        else:
+            self.observation_space = spaces.Box(low=0, high=17, shape=(6, 6), dtype=np.uint8)
 
         self._np_random = None
         self._np_random_seed = -1
+        self.action_mask = action_mask(self.board.state, self.current_side)
 
     def _get_obs(self):
-        obs = np.zeros((6, 6), dtype=np.uint8)
-        piece_map = {
-            'P': 1,  # Pawn
-            'R': 2,  # Rook
-            'N': 3,  # Knight
-            'B': 4,  # Bishop
-            'Q': 5,  # Queen
-            'K': 6,  # King
-            'S': 7,  # Star
-            'J': 8   # Joker
-        }
-
-        board_state = self.board.get_board_state()
-        for i in range(6):
-            for j in range(6):
-                cell = board_state[i][j]
-                if cell:
-                    color, piece = cell[0], cell[1]
-                    offset = 0 if color == 'w' else 9
-                    obs[i][j] = piece_map.get(piece, 0) + offset
-
-        return obs
+        if self.obs_mode == "planes":
+            return self._encoder.encode(self.board.state)
+        return to_obs(self.board)
 
     def _get_info(self):
         return {
-            "valid_moves": self.board.get_all_valid_moves(self.current_side),
+            "action_mask": self.action_mask,
             "turn": self.current_side,
             "is_check": self.board.is_in_check(self.current_side),
             "is_checkmate": self.board.is_in_checkmate(self.current_side),
@@ -77,43 +100,77 @@ class ACMChessEnv(gym.Env):
             self._np_random, self._np_random_seed = np.random.default_rng(), -1
 
         self.board = Board(self.width, self.height)
-        self.current_side = 'white'
+        self.board.verbose = False
+        if options is not None and options.get("position") is not None:
+            self.board.set_state(options["position"])
+        self.current_side = self.board.turn
         self.done = False
+        self.action_mask = action_mask(self.board.state, self.current_side)
 
         return self._get_obs(), self._get_info()
 
-    def step(self, action):
-        from_pos, to_pos = self.decode_action(action)
-        from_row, from_col = from_pos
-        to_row, to_col = to_pos
-
-        start_pos = (from_col, from_row)
-        end_pos = (to_col, to_row)
+    def set_state(self, position, turn='white'):
+        """
+        Continue from another position: notation text or packed bytes (see
+        data/classes/Encoding.py), a GameState or Board, or an observation
+        array. A board observation does not say whose move it is, turn does;
+        planes carry the side to move and the move count themselves.
+        Returns the observation and info like reset.
+        """
+        if isinstance(position, np.ndarray):
+            if position.shape == (NUM_PLANES, 6, 6):
+                position = from_cells(*decode_planes(position))
+            else:
+                position = from_obs(position, turn)
+        self.board.set_state(position)
+        self.current_side = self.board.turn
+        self.done = False
+        self.action_mask = action_mask(self.board.state, self.current_side)
+        return self._get_obs(), self._get_info()
 
-        legal_moves = self.board.get_all_valid_moves(self.current_side)
+    def step(self, action):
+        start_pos, end_pos = self.decode_action(action)
         terminated = False
         truncated = False
         reward = 0
 
-        if (from_pos, to_pos) not in legal_moves:
-            self.board.make_random_move(self.current_side)
+        legal = np.flatnonzero(self.action_mask)
+        if not len(legal):
+            # the game is over (or set_state gave a position without a move),
+            # nothing is played
+            self.done = True
+            return self._get_obs(), 0, True, False, self._get_info()
+
+        if not self.action_mask[move_to_action((start_pos, end_pos))]:
+            # an illegal action is replaced by a random legal move
+            start_pos, end_pos = ACTION_MOVES[self.np_random.choice(legal)]
             reward = -1
-        else:
-            self.board.handle_move(start_pos, end_pos)
-            opponent = 'black' if self.current_side == 'white' else 'white'
-            if self.board.is_in_checkmate(opponent):
-                reward = 1
-                terminated = True
-            elif self.board.is_in_draw():
-                truncated = True
-            self.current_side = opponent
+
+        self.board.handle_move(start_pos, end_pos)
+        opponent = 'black' if self.current_side == 'white' else 'white'
+        if self.board.is_in_checkmate(opponent):
+            reward = 1
+            terminated = True
+        elif self.board.is_in_draw():
+            truncated = True
+        self.current_side = opponent
+        self.action_mask = action_mask(self.board.state, self.current_side)
+        if not terminated and not truncated and not self.action_mask.any():
+            # the opponent cannot move: a draw, like in Match.py
+            terminated = True
 
         self.done = terminated or truncated
         return self._get_obs(), reward, terminated, truncated, self._get_info()
 
     def decode_action(self, action):
-        """Decode MultiDiscrete action to ((from_row, from_col), (to_row, to_col))"""
-        return (action[0], action[1]), (action[2], action[3])
+        """
+        Decode an action to the Board move ((from_x, from_y), (to_x, to_y)).
+        Takes a flat action, or the old (from_row, from_col, to_row, to_col)
+        """
+        if np.ndim(action) == 0:
+            return ACTION_MOVES[int(action)]
+        from_row, from_col, to_row, to_col = (int(value) for value in action)
+        return (from_col, from_row), (to_col, to_row)
 
     def render(self):
         if self.render_mode == "ansi":
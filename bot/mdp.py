@@ -1,105 +1,156 @@
-from sortedcontainers import SortedDict
+import os
+
 import numpy as np
-import ubjson
 
 from tqdm import tqdm
 
+import qstore
+from qtable import QTable, UNSEEN
+from sumtree import SumTree
+
+# priorities are exp(best Q / temperature), clipped to stay finite
+MAX_EXPONENT = 60.0
+
 class MDPModel:
-    def __init__(self, gamma=0.99):
+    def __init__(self, gamma=0.99, num_actions=36 * 36, temperature=1.0, compact_ratio=1.0):
         self.gamma = gamma
-        # Qtable store negative Q values
-        self.state_action_map = {}
-        self.qtable = SortedDict() # ((36), (1), (1)) -> (1)
-    
-    def sample(self, prob = 0.5, num_samples = 1000):
-        # Sample a random state from the qtable
-        probs = np.zeros(num_samples)
-        states = []
-        counter = 0
-        for key, value in self.qtable.items():
-            if np.random.random() < prob:
-                probs[counter] = value
-                states.append(key)
-                counter += 1
-            if counter >= num_samples:
-                break
-        
-        probs = np.exp(probs)
-        probs /= np.sum(probs)
-        idx = np.random.choice(len(states), p=probs)
-        return states[idx][0]
-    
+        # Qtable store negative Q values, one row per state (see qtable.py).
+        # Actions are ACMChessEnv's flat actions, from_square * 36 + to_square
+        self.qtable = QTable(num_actions)
+        # sampling priority per state ID, a softmax over the states' best Q.
+        # Built on the first sample, so loading a model for play skips it
+        self.temperature = temperature
+        self.priorities = None
+        # save rewrites the file once the rows appended since it was last
+        # compacted outnumber compact_ratio times the states in the table
+        self.compact_ratio = compact_ratio
+
+    def encode_action(self, action):
+        # flat action, (from_square, to_square) pairs are accepted too
+        if np.ndim(action) == 0:
+            return int(action)
+        from_square, to_square = action
+        return int(from_square) * 36 + int(to_square)
+
+    def _priorities(self, state_ids):
+        exponents = self.qtable.max_values(state_ids).astype(np.float64) / self.temperature
+        return np.exp(np.clip(exponents, -MAX_EXPONENT, MAX_EXPONENT))
+
+    def set_temperature(self, temperature):
+        # every priority is recomputed on the next sample, O(states)
+        self.temperature = temperature
+        self.priorities = None
+
+    def _build_priorities(self):
+        state_ids = np.flatnonzero(self.qtable.counts[:len(self.qtable)])
+        self.priorities = SumTree(len(self.qtable))
+        self.priorities.update(state_ids, self._priorities(state_ids))
+
+    def sample(self, batch_size=None):
+        # Sample a random state from the qtable, states with a higher best Q
+        # more often (softmax with self.temperature). O(log states) per
+        # draw, batch_size draws at once return an array of states
+        if self.priorities is None:
+            self._build_priorities()
+        if self.priorities.total() <= 0:
+            return None
+        state_ids = self.priorities.sample(1 if batch_size is None else batch_size)
+        if batch_size is None:
+            return self.qtable.state(state_ids[0])
+        return self.qtable.keys[state_ids].reshape((batch_size,) + tuple(self.qtable.state_shape))
+
     def update(self, state, action, reward, next_state):
-        key = (state, action)
-        if state not in self.state_action_map:
-            self.state_action_map[state] = set()
-        self.state_action_map[state].add(action)
-        if key not in self.qtable:
-            self.qtable[key] = 0
-        if next_state not in self.state_action_map:
-            self.qtable[key] = -reward
-        else:
-            action_set = self.state_action_map[next_state]
-            max_q = max([self.qtable.get((next_state, a), -1e6) for a in action_set], default=0)
-            self.qtable[key] = -reward + self.gamma * max_q
-    
+        self.update_batch([state], [action], [reward], [next_state])
+
+    def update_batch(self, states, actions, rewards, next_states):
+        # update from a batch of transitions at once. All targets use the
+        # Q-values from before the batch
+        table = self.qtable
+        state_ids = table.get_ids(states, add=True)
+        next_ids = table.get_ids(next_states)
+        actions = np.fromiter((self.encode_action(action) for action in actions), dtype=np.intp, count=len(state_ids))
+        targets = -np.asarray(rewards, dtype=np.float32) + self.gamma * table.max_values(next_ids)
+        table.set_values(state_ids, actions, targets)
+        if self.priorities is not None:
+            changed = np.unique(state_ids)
+            self.priorities.update(changed, self._priorities(changed))
+
     def step(self, state, explore=0.0):
         # Sample a random action from the state
-        if state not in self.state_action_map:
-            return (np.random.randint(0, 36), np.random.randint(0, 36))
+        table = self.qtable
+        state_id = table.get_id(state)
+        if state_id < 0 or table.counts[state_id] == 0:
+            return np.random.randint(0, table.num_actions)
+        row = table.values[state_id]
         if np.random.random() < explore:
-            action_set = self.state_action_map[state]
-            action = np.random.choice(list(action_set))
-            return (state, action)
-        action_set = self.state_action_map[state]
-        max_q = -1e6
-        best_action = None
-        for action in action_set:
-            q = self.qtable.get((state, action), -1e6)
-            if q > max_q:
-                max_q = q
-                best_action = action
-        if best_action is None:
-            return (np.random.randint(0, 36), np.random.randint(0, 36))
-        else:
-            return best_action
-        
+            return int(np.random.choice(np.flatnonzero(row != UNSEEN)))
+        return int(row.argmax())
+
     def save(self, filename):
-        with open(filename, 'wb') as f:
-            ubjson.dump({
-                'gamma': self.gamma,
-                'state_action_map': self.state_action_map,
-                'qtable': self.qtable
-            }, f)
-    
-    def load(self, filename):
-        with open(filename, 'rb') as f:
-            data = ubjson.load(f)
-            self.gamma = data['gamma']
-            self.state_action_map = data['state_action_map']
-            self.qtable = SortedDict(data['qtable'])
-    
+        # appends the states changed since the last save, see qstore.py
+        table = self.qtable
+        try:
+            header, chunks = qstore.read_chunks(filename)
+            compatible = header["num_actions"] == table.num_actions and header["dtype"] == table.dtype
+        except (OSError, ValueError):
+            compatible = False
+        if not compatible or table.keys is None:
+            qstore.compact(filename, table, self.gamma, self.temperature)
+            return
+        appended = qstore.append(filename, table)
+        # the first chunk is the compacted one unless the file was only ever
+        # appended to
+        appended += sum(count for _, flags, count in chunks if not flags & qstore.SORTED)
+        if appended > self.compact_ratio * max(table.size, 1):
+            qstore.compact(filename, table, self.gamma, self.temperature)
+
+    def compact(self, filename):
+        qstore.compact(filename, self.qtable, self.gamma, self.temperature)
+
+    def load(self, filename, mmap=True):
+        # a compacted file is memory-mapped, so this returns at once whatever
+        # its size. Rows are read from disk as they are used
+        self.qtable, self.gamma, self.temperature = qstore.load(filename, mmap)
+        self.priorities = None
+
 class MDPTrainer:
-    def __init__(self, env, model, explore=0.5, save_interval=1000, save_path='model.ubjson'):
+    def __init__(self, env, model, explore=0.5, save_interval=1000, save_path='model.qtable'):
         self.env = env
         self.model = model
         self.explore = explore
         self.save_interval = save_interval
         self.save_path = save_path
     
+    def _state(self, obs, turn):
+        # the model's state: the observation with the side to move appended,
+        # so a board with white to move and the same board with black to
+        # move are different states
+        obs = np.asarray(obs)
+        return np.append(obs.ravel(), obs.dtype.type(turn == 'black'))
+
     def train(self, num_steps=10000):
         done = True
         for step in tqdm(range(num_steps)):
             if done:
-                state, _ = self.env.reset()
+                obs, info = self.env.reset()
+                state = self._state(obs, info["turn"])
                 done = False
             action = self.model.step(state, self.explore)
-            next_state, reward, done, _ = self.env.step(action)
+            obs, reward, terminated, truncated, info = self.env.step(action)
+            done = terminated or truncated
+            next_state = self._state(obs, info["turn"])
             self.model.update(state, action, reward, next_state)
             state = next_state
             if step % self.save_interval == 0:
                 self.model.save(self.save_path)
             
-            if step % 200:
-                done = False
-                self.env.set_state(self.model.sample()) 
\ No newline at end of file
+            # every 200 steps carry on from a known state instead, picked by
+            # the model, with the side to move it was recorded with
+            if step % 200 == 0:
+                sample = self.model.sample()
+                if sample is not None:
+                    turn = 'black' if sample[-1] else 'white'
+                    obs = sample[:-1].reshape(self.env.observation_space.shape)
+                    obs, info = self.env.set_state(obs, turn)
+                    state = self._state(obs, info["turn"])
+                    done = not self.env.action_mask.any()
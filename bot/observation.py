@@ -0,0 +1,97 @@
+import numpy as np
+import sys
+import os
+
+# Add the project root directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data.classes.GameState import WHITE, BLACK, PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, JOKER, STAR
+
+# Plane observations, NUM_PLANES x 6 x 6 float32 with [plane][row][col]:
+#   0-7   white Pawn, Knight, Bishop, Rook, Queen, King, Joker, Star
+#   8-15  the same for black
+#   16    all ones when white is to move
+#   17    moves left until the game is drawn, as a fraction of MAX_MOVES
+#   18-19 white / black pawns that promote to a Joker with their next push
+NUM_PLANES = 20
+MAX_MOVES = 100  # GameState.is_in_draw
+
+PIECE_PLANES = np.array(
+    [[code] for code in (PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, JOKER, STAR)]
+    + [[-code] for code in (PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, JOKER, STAR)],
+    dtype=np.int8,
+)
+# rows pawns promote from, white moves up to row 0 and black down to row 5
+PROMOTION_ROWS = np.zeros((2, 36), dtype=np.float32)
+PROMOTION_ROWS[0, 6:12] = 1
+PROMOTION_ROWS[1, 24:30] = 1
+
+
+def encode_planes_batch(boards, turns, num_moves, out=None):
+    """
+    Planes for N positions at once. boards is (N, 36) of signed piece codes
+    (square row * 6 + col), turns (N,) with 1 for white and -1 for black to
+    move, num_moves (N,). Written into out, an (N, NUM_PLANES, 6, 6) float32
+    array, when it is given. Returns the planes.
+    """
+    boards = np.asarray(boards, dtype=np.int8)
+    n = len(boards)
+    if out is None:
+        out = np.empty((n, NUM_PLANES, 6, 6), dtype=np.float32)
+    flat = out.reshape(n, NUM_PLANES, 36)
+    np.equal(boards[:, None, :], PIECE_PLANES[None], out=flat[:, :16])
+    flat[:, 16] = (np.asarray(turns) > 0)[:, None]
+    flat[:, 17] = ((MAX_MOVES - np.asarray(num_moves, dtype=np.float32)) / MAX_MOVES)[:, None]
+    np.multiply(flat[:, 0], PROMOTION_ROWS[0], out=flat[:, 18])
+    np.multiply(flat[:, 8], PROMOTION_ROWS[1], out=flat[:, 19])
+    return out
+
+
+def decode_planes(planes):
+    """
+    (cells, turn, num_moves) of one (NUM_PLANES, 6, 6) observation, the
+    inverse of encode_planes_batch.
+    """
+    flat = np.asarray(planes).reshape(NUM_PLANES, 36)
+    cells = (PIECE_PLANES[:, 0, None] * (flat[:16] > 0.5)).sum(axis=0)
+    turn = WHITE if flat[16, 0] > 0.5 else BLACK
+    num_moves = int(round(MAX_MOVES - float(flat[17, 0]) * MAX_MOVES))
+    return cells.tolist(), turn, num_moves
+
+
+class PlaneEncoder:
+    """
+    Encodes GameStates (or Boards) into planes inside one preallocated buffer,
+    so feeding a network costs no allocation. The returned arrays are views of
+    that buffer and are overwritten by the next call, copy them to keep them.
+    """
+
+    def __init__(self, batch_size=1):
+        self.buffer = np.zeros((batch_size, NUM_PLANES, 6, 6), dtype=np.float32)
+        self._boards = np.zeros((batch_size, 36), dtype=np.int8)
+        self._turns = np.zeros(batch_size, dtype=np.int8)
+        self._num_moves = np.zeros(batch_size, dtype=np.int16)
+
+    def encode(self, state):
+        # (NUM_PLANES, 6, 6) planes of one position
+        return self.encode_many([state])[0]
+
+    def encode_many(self, states):
+        # (len(states), NUM_PLANES, 6, 6) planes, at most batch_size states
+        n = len(states)
+        if n > len(self.buffer):
+            raise ValueError(f"{n} states do not fit a batch of {len(self.buffer)}")
+        for i, state in enumerate(states):
+            state = getattr(state, "state", state)
+            self._boards[i] = state.cells
+            self._turns[i] = 1 if state.turn == WHITE else -1
+            self._num_moves[i] = state.num_moves
+        return encode_planes_batch(
+            self._boards[:n], self._turns[:n], self._num_moves[:n], out=self.buffer[:n]
+        )
+
+    def encode_arrays(self, boards, turns, num_moves):
+        # planes of positions already held as arrays, like VectorACMChessEnv's
+        n = len(boards)
+        if n > len(self.buffer):
+            raise ValueError(f"{n} boards do not fit a batch of {len(self.buffer)}")
+        return encode_planes_batch(boards, turns, num_moves, out=self.buffer[:n])
@@ -0,0 +1,177 @@
+import os
+import struct
+
+import numpy as np
+
+from qtable import QTable
+
+# File layout, little endian:
+#   header   HEADER: magic, version, num_actions, key length, key dtype,
+#            state dimensions and shape, gamma, temperature
+#   chunks   CHUNK: magic, flags, row count, then the rows' keys, counts
+#            (int32) and Q-values (float32 x num_actions), each section
+#            padded to 8 bytes
+# save appends a chunk of the rows changed since the last save. A key can be
+# in several chunks, the last one wins. Compaction rewrites the file as a
+# single chunk with every row sorted by key, which load can memory-map.
+MAGIC = b"ACMQ"
+VERSION = 1
+HEADER = struct.Struct("<4sIII4sI4Idd")
+CHUNK_MAGIC = b"ROWS"
+CHUNK = struct.Struct("<4sIQ")
+SORTED = 1
+# rows written at a time while compacting
+COMPACT_ROWS = 1 << 16
+
+
+def _padded(size):
+    return (size + 7) & ~7
+
+
+def _chunk_sizes(count, key_bytes, num_actions):
+    keys = _padded(count * key_bytes)
+    counts = _padded(count * 4)
+    return keys, counts, count * num_actions * 4
+
+
+def _write_header(f, table, gamma, temperature):
+    shape = tuple(table.state_shape or ())
+    f.write(HEADER.pack(
+        MAGIC,
+        VERSION,
+        table.num_actions,
+        table.keys.shape[1] if table.keys is not None else 0,
+        # blank for a table that has not seen a state yet
+        (table.dtype.str if table.dtype is not None else "").encode().ljust(4),
+        len(shape),
+        *(shape + (0,) * (4 - len(shape))),
+        gamma,
+        temperature,
+    ))
+
+
+def _write_rows(f, table, rows, flags=0):
+    key_bytes = table.keys.shape[1] * table.dtype.itemsize
+    key_size, count_size, _ = _chunk_sizes(len(rows), key_bytes, table.num_actions)
+    f.write(CHUNK.pack(CHUNK_MAGIC, flags, len(rows)))
+    # each section is written in slices so a large table is never copied
+    # whole
+    for name, size in (("keys", key_size), ("counts", count_size), ("values", None)):
+        written = 0
+        for start in range(0, len(rows), COMPACT_ROWS):
+            part = getattr(table, name)[rows[start:start + COMPACT_ROWS]]
+            data = np.ascontiguousarray(part).tobytes()
+            f.write(data)
+            written += len(data)
+        if size is not None:
+            f.write(b"\0" * (size - written))
+
+
+def read_header(path):
+    with open(path, "rb") as f:
+        data = f.read(HEADER.size)
+    if len(data) < HEADER.size:
+        raise ValueError(f"{path} is not a Q-table file")
+    magic, version, num_actions, key_length, dtype, ndim, *rest = HEADER.unpack(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a version {VERSION} Q-table file")
+    shape = tuple(rest[:ndim])
+    return {
+        "num_actions": num_actions,
+        "key_length": key_length,
+        "dtype": np.dtype(dtype.strip().decode()) if dtype.strip() else None,
+        "state_shape": shape,
+        "gamma": rest[4],
+        "temperature": rest[5],
+    }
+
+
+def read_chunks(path):
+    # (offset of the rows, flags, row count) of every chunk in the file
+    header = read_header(path)
+    key_bytes = header["key_length"] * header["dtype"].itemsize if header["dtype"] is not None else 0
+    chunks = []
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        offset = HEADER.size
+        while offset + CHUNK.size <= size:
+            f.seek(offset)
+            magic, flags, count = CHUNK.unpack(f.read(CHUNK.size))
+            if magic != CHUNK_MAGIC:
+                raise ValueError(f"{path} has a damaged chunk at byte {offset}")
+            rows = sum(_chunk_sizes(count, key_bytes, header["num_actions"]))
+            if offset + CHUNK.size + rows > size:
+                # a save that was cut off, the rows before it are intact
+                break
+            chunks.append((offset + CHUNK.size, flags, count))
+            offset += CHUNK.size + rows
+    return header, chunks
+
+
+def compact(path, table, gamma, temperature):
+    # rewrites path as one sorted chunk of every row in table. Written to a
+    # temporary file first, so a reader never sees a half-written table
+    rows = np.arange(table.size)
+    if table.size:
+        rows = np.argsort(table._void(table.keys[:table.size]), kind="stable")
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as f:
+        _write_header(f, table, gamma, temperature)
+        if table.keys is not None:
+            _write_rows(f, table, rows, SORTED)
+    os.replace(temporary, path)
+    table.dirty[:table.size] = False
+
+
+def append(path, table):
+    # appends the rows changed since the last save, returns how many
+    rows = np.flatnonzero(table.dirty[:table.size])
+    if len(rows):
+        with open(path, "ab") as f:
+            _write_rows(f, table, rows)
+        table.dirty[rows] = False
+    return len(rows)
+
+
+def load(path, mmap=True):
+    # (table, gamma, temperature). A compacted file is memory-mapped
+    # copy-on-write when mmap is set: loading costs no reading, and changes
+    # to the table stay in memory until the next save
+    header, chunks = read_chunks(path)
+    num_actions = header["num_actions"]
+    dtype = header["dtype"]
+    key_length = header["key_length"]
+    key_bytes = key_length * dtype.itemsize if dtype is not None else 0
+
+    def arrays(offset, count, mode):
+        key_size, count_size, _ = _chunk_sizes(count, key_bytes, num_actions)
+        if mode is None:
+            with open(path, "rb") as f:
+                f.seek(offset)
+                data = f.read(key_size + count_size + count * num_actions * 4)
+            keys = np.frombuffer(data, dtype=dtype, count=count * key_length).reshape(count, key_length)
+            counts = np.frombuffer(data, dtype=np.int32, count=count, offset=key_size)
+            values = np.frombuffer(data, dtype=np.float32, offset=key_size + count_size).reshape(count, num_actions)
+            return keys, counts, values
+        keys = np.memmap(path, dtype=dtype, mode=mode, offset=offset, shape=(count, key_length))
+        counts = np.memmap(path, dtype=np.int32, mode=mode, offset=offset + key_size, shape=(count,))
+        values = np.memmap(path, dtype=np.float32, mode=mode, offset=offset + key_size + count_size, shape=(count, num_actions))
+        return keys, counts, values
+
+    if len(chunks) == 1 and chunks[0][1] & SORTED and chunks[0][2]:
+        offset, _, count = chunks[0]
+        keys, counts, values = arrays(offset, count, "c" if mmap else None)
+        if not mmap:
+            keys, counts, values = keys.copy(), counts.copy(), values.copy()
+        table = QTable.from_sorted(keys, values, counts, header["state_shape"])
+    else:
+        table = QTable(num_actions, dtype=dtype)
+        for offset, _, count in chunks:
+            if not count:
+                continue
+            keys, counts, values = arrays(offset, count, None)
+            state_ids = table.get_ids(keys.reshape((count,) + header["state_shape"]), add=True)
+            table.values[state_ids] = values
+            table.counts[state_ids] = counts
+        table.dirty[:table.size] = False
+    return table, header["gamma"], header["temperature"]
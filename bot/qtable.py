@@ -0,0 +1,179 @@
+import numpy as np
+
+# Q-values of actions never updated
+UNSEEN = -np.inf
+
+
+class QTable:
+    """
+    Q-values in one growable float32 array of shape (states, num_actions).
+    States are given dense integer IDs in the order they are first seen, keyed
+    by the bytes of the state array in the dtype of the first state (uint8
+    board observations, float32 planes), so a row costs num_actions * 4 bytes and
+    a lookup is one dict access. Actions are integers below num_actions (the
+    flat from_square * 36 + to_square of ACMChessEnv by default).
+
+    A table loaded from a compacted file (see qstore.py) starts with its rows
+    sorted by key, those are found by binary search instead of the dict, so
+    the arrays can stay memory-mapped and nothing is built per state.
+    """
+
+    def __init__(self, num_actions=36 * 36, capacity=1024, dtype=None):
+        self.num_actions = num_actions
+        # key dtype, None until the first state fixes it
+        self.dtype = np.dtype(dtype) if dtype is not None else None
+        self.ids = {}
+        self.size = 0
+        self.state_shape = None
+        self.keys = None
+        self.values = np.full((capacity, num_actions), UNSEEN, dtype=np.float32)
+        # actions updated so far per state, 0 means the state has no Q-values
+        self.counts = np.zeros(capacity, dtype=np.int32)
+        # rows changed since the last save
+        self.dirty = np.zeros(capacity, dtype=bool)
+        # the first base rows are sorted by key and not in self.ids
+        self.base = 0
+        self._index = None
+
+    @classmethod
+    def from_sorted(cls, keys, values, counts, state_shape):
+        # a table over arrays whose rows are sorted by key, which may be
+        # memory-mapped. They are only copied once a state is added
+        table = cls(values.shape[1], capacity=1, dtype=keys.dtype)
+        table.keys = keys
+        table.values = values
+        table.counts = counts
+        table.dirty = np.zeros(len(keys), dtype=bool)
+        table.size = table.base = len(keys)
+        table.state_shape = tuple(state_shape)
+        table._index = table._void(keys)
+        return table
+
+    def _void(self, keys):
+        # one opaque element per key, ordered like the key bytes
+        keys = np.ascontiguousarray(keys, dtype=self.dtype).reshape(len(keys), -1)
+        return keys.view(np.dtype((np.void, keys.shape[1] * self.dtype.itemsize))).ravel()
+
+    def _find_sorted(self, keys):
+        # IDs of keys among the sorted base rows, -1 where they are not there
+        output = np.full(len(keys), -1, dtype=np.intp)
+        if not self.base or not len(keys):
+            return output
+        query = self._void(keys)
+        found = np.searchsorted(self._index, query)
+        inside = found < self.base
+        inside[inside] = self._index[found[inside]] == query[inside]
+        output[inside] = found[inside]
+        return output
+
+    def __len__(self):
+        return self.size
+
+    def _as_keys(self, states):
+        # states as an array of the key dtype. A state that would lose
+        # information in it (a float plane in an integer table) is refused
+        # rather than merged with other states
+        states = np.asarray(states)
+        if self.dtype is None:
+            self.dtype = states.dtype
+        elif not np.can_cast(states.dtype, self.dtype, "same_kind"):
+            raise ValueError(f"{states.dtype} states do not fit a table keyed by {self.dtype}")
+        return np.ascontiguousarray(states, dtype=self.dtype)
+
+    def key(self, state):
+        return self._as_keys(state).tobytes()
+
+    def _grow(self, needed):
+        capacity = len(self.values)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        values = np.full((capacity, self.num_actions), UNSEEN, dtype=np.float32)
+        values[:self.size] = self.values[:self.size]
+        self.values = values
+        counts = np.zeros(capacity, dtype=np.int32)
+        counts[:self.size] = self.counts[:self.size]
+        self.counts = counts
+        dirty = np.zeros(capacity, dtype=bool)
+        dirty[:self.size] = self.dirty[:self.size]
+        self.dirty = dirty
+        keys = np.zeros((capacity, self.keys.shape[1]), dtype=self.dtype)
+        keys[:self.size] = self.keys[:self.size]
+        self.keys = keys
+        if self.base:
+            self._index = self._void(self.keys[:self.base])
+
+    def _add(self, key, shape):
+        if self.keys is None:
+            self.state_shape = shape
+            self.keys = np.zeros((len(self.values), len(key) // self.dtype.itemsize), dtype=self.dtype)
+        self._grow(self.size + 1)
+        state_id = self.size
+        self.ids[key] = state_id
+        self.keys[state_id] = np.frombuffer(key, dtype=self.dtype)
+        self.dirty[state_id] = True
+        self.size += 1
+        return state_id
+
+    def get_id(self, state, add=False):
+        # dense ID of state, -1 if it is unknown and add is False
+        key = self.key(state)
+        state_id = self.ids.get(key, -1)
+        if state_id < 0 and self.base:
+            state_id = int(self._find_sorted(np.frombuffer(key, dtype=self.dtype)[None])[0])
+        if state_id < 0 and add:
+            state_id = self._add(key, np.shape(state))
+        return state_id
+
+    def get_ids(self, states, add=False):
+        # IDs of a batch of states, an array of them is keyed in one
+        # conversion instead of one per state
+        if not isinstance(states, np.ndarray):
+            return np.fromiter((self.get_id(state, add) for state in states), dtype=np.intp, count=len(states))
+        states = self._as_keys(states)
+        output = self._find_sorted(states.reshape(len(states), -1))
+        if not len(states):
+            return output
+        data = states.tobytes()
+        size = len(data) // len(states)
+        ids = self.ids
+        for i in np.flatnonzero(output < 0):
+            key = data[i * size:(i + 1) * size]
+            state_id = ids.get(key, -1)
+            if state_id < 0 and add:
+                state_id = self._add(key, states.shape[1:])
+            output[i] = state_id
+        return output
+
+    def state(self, state_id):
+        # the state array of an ID
+        return self.keys[state_id].reshape(self.state_shape)
+
+    def known(self, state):
+        state_id = self.get_id(state)
+        return state_id >= 0 and self.counts[state_id] > 0
+
+    def max_values(self, state_ids):
+        # best Q-value of each state, 0 for unknown states and states without
+        # Q-values
+        state_ids = np.asarray(state_ids, dtype=np.intp)
+        output = np.zeros(len(state_ids), dtype=np.float32)
+        known = state_ids >= 0
+        known[known] = self.counts[state_ids[known]] > 0
+        output[known] = self.values[state_ids[known]].max(axis=1)
+        return output
+
+    def set_values(self, state_ids, actions, values):
+        state_ids = np.asarray(state_ids, dtype=np.intp)
+        actions = np.asarray(actions, dtype=np.intp)
+        new = self.values[state_ids, actions] == UNSEEN
+        self.values[state_ids, actions] = values
+        self.dirty[state_ids] = True
+        # a pair can be in the batch more than once
+        pairs = np.unique(state_ids[new] * self.num_actions + actions[new])
+        np.add.at(self.counts, pairs // self.num_actions, 1)
+
+    def nbytes(self):
+        # memory of the arrays in use, the ID dict not counted
+        return self.size * (self.num_actions * 4 + 4 + (self.keys.shape[1] * self.dtype.itemsize if self.keys is not None else 0))
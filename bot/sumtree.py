@@ -0,0 +1,93 @@
+import numpy as np
+
+
+class SumTree:
+    """
+    Priorities of items 0..n-1 in a binary sum tree kept in one float64
+    array: node i has children 2i and 2i + 1, leaves start at capacity.
+    Updating a priority and drawing an item with probability proportional to
+    its priority are O(log n), and both work on whole batches at once.
+    """
+
+    def __init__(self, capacity=1024):
+        size = 1
+        while size < capacity:
+            size *= 2
+        self.capacity = size
+        self.tree = np.zeros(2 * size, dtype=np.float64)
+
+    def __len__(self):
+        return self.capacity
+
+    def total(self):
+        return self.tree[1]
+
+    def _grow(self, needed):
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        leaves = self.tree[self.capacity:]
+        self.capacity = capacity
+        self.tree = np.zeros(2 * capacity, dtype=np.float64)
+        self.tree[capacity:capacity + len(leaves)] = leaves
+        # rebuild the inner nodes level by level
+        start = capacity // 2
+        while start:
+            nodes = np.arange(start, 2 * start)
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+            start //= 2
+
+    def get(self, items):
+        return self.tree[self.capacity + np.asarray(items, dtype=np.intp)]
+
+    def update(self, items, priorities):
+        # sets the priorities of items, an item may only appear once
+        items = np.asarray(items, dtype=np.intp)
+        if not len(items):
+            return
+        needed = int(items.max()) + 1
+        if needed > self.capacity:
+            self._grow(needed)
+        nodes = self.capacity + items
+        self.tree[nodes] = priorities
+        nodes = np.unique(nodes // 2)
+        while nodes[0] >= 1:
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+            if nodes[0] == 1:
+                break
+            nodes = np.unique(nodes // 2)
+
+    def sample(self, count, rng=np.random):
+        # count items drawn with probability priority / total, with
+        # replacement. Needs a positive total
+        if count == 1:
+            return np.array([self.sample_one(rng)], dtype=np.intp)
+        values = rng.random(count) * self.tree[1]
+        nodes = np.ones(count, dtype=np.intp)
+        tree = self.tree
+        while nodes[0] < self.capacity:
+            left = tree[2 * nodes]
+            right = values >= left
+            values = np.where(right, values - left, values)
+            nodes = 2 * nodes + right
+        # float rounding can walk into an empty leaf past the last item
+        items = nodes - self.capacity
+        empty = tree[nodes] <= 0
+        if empty.any():
+            items[empty] = np.flatnonzero(tree[self.capacity:] > 0)[-1]
+        return items
+
+    def sample_one(self, rng=np.random):
+        # a single draw, walking the tree with Python scalars is faster than
+        # array ops on batches of one
+        tree = self.tree
+        capacity = self.capacity
+        value = rng.random() * tree[1]
+        node = 1
+        while node < capacity:
+            node *= 2
+            left = tree[node]
+            if value >= left and tree[node + 1] > 0:
+                value -= left
+                node += 1
+        return node - capacity
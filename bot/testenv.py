@@ -13,14 +13,13 @@ def test_env():
     assert isinstance(info, dict), "Info must be a dictionary"
 
     # Try one valid move
-    valid_moves = info["valid_moves"]
-    if not valid_moves:
+    valid_actions = np.flatnonzero(info["action_mask"])
+    if len(valid_actions) == 0:
         print("No valid moves available.")
         return
 
-    # Convert ((row, col), (row, col)) → (from_row, from_col, to_row, to_col)
-    (from_row, from_col), (to_row, to_col) = valid_moves[0]
-    action = (from_row, from_col, to_row, to_col)
+    # actions are from_square * 36 + to_square
+    action = valid_actions[0]
 
     obs, reward, terminated, truncated, info = env.step(action)
 
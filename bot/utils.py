@@ -22,6 +22,19 @@ class PieceType(IntEnum):
     BLACK_STAR = -8
 
 
+# (x, y) here is (row, col), row 0 being black's back rank. Square numbers
+# are row * 6 + col
+ROOK_DELTAS = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+BISHOP_DELTAS = [(1, 1), (1, -1), (-1, 1), (-1, -1)]
+QUEEN_DELTAS = ROOK_DELTAS + BISHOP_DELTAS
+KNIGHT_DELTAS = [(2, 1), (1, 2), (-1, 2), (-2, 1), (-2, -1), (-1, -2), (1, -2), (2, -1)]
+KING_DELTAS = QUEEN_DELTAS
+STAR_DELTAS = BISHOP_DELTAS + [(-2, 0), (2, 0), (0, -2), (0, 2)]
+JOKER_DELTAS = QUEEN_DELTAS + [(-2, 0), (2, 0), (0, -2), (0, 2), (-2, -2), (-2, 2), (2, -2), (2, 2)]
+# rows pawns start on, a pawn there has never moved and may step twice
+PAWN_START_ROW = {True: 4, False: 1}
+
+
 def in_bounds(x, y):
     return 0 <= x < 6 and 0 <= y < 6
 
@@ -79,9 +92,9 @@ def generate_pawn_moves(board, x, y, is_white):
     nx, ny = x + direction, y
     if in_bounds(nx, ny) and board[nx][ny] == PieceType.EMPTY:
         moves.append((nx, ny))
-        # Forward 2 if first square is free
+        # Forward 2 from the starting row if first square is free
         nx2 = x + 2 * direction
-        if in_bounds(nx2, y) and board[nx2][y] == PieceType.EMPTY:
+        if x == PAWN_START_ROW[is_white] and board[nx2][y] == PieceType.EMPTY:
             moves.append((nx2, y))
 
     # Diagonal captures
@@ -113,15 +126,14 @@ def generate_star_moves(board, x, y):
 
 
 def generate_joker_moves(board, x, y):
+    # one square in any direction, or a jump of two squares in any straight
+    # or diagonal direction: 16 offsets, not the whole 5x5 square
     piece = board[x][y]
     moves = []
-    for dx in [-2, -1, 0, 1, 2]:
-        for dy in [-2, -1, 0, 1, 2]:
-            if dx == 0 and dy == 0:
-                continue
-            nx, ny = x + dx, y + dy
-            if in_bounds(nx, ny) and (board[nx][ny] == PieceType.EMPTY or is_opponent(piece, board[nx][ny])):
-                moves.append((nx, ny))
+    for dx, dy in JOKER_DELTAS:
+        nx, ny = x + dx, y + dy
+        if in_bounds(nx, ny) and (board[nx][ny] == PieceType.EMPTY or is_opponent(piece, board[nx][ny])):
+            moves.append((nx, ny))
     return moves
 
 
@@ -137,12 +149,11 @@ def get_legal_moves(board, from_pos):
     if abs_piece == PieceType.WHITE_PAWN:
         return generate_pawn_moves(board, x, y, is_white)
     elif abs_piece == PieceType.WHITE_ROOK:
-        return generate_sliding_moves(board, x, y, [(1, 0), (-1, 0), (0, 1), (0, -1)])
+        return generate_sliding_moves(board, x, y, ROOK_DELTAS)
     elif abs_piece == PieceType.WHITE_BISHOP:
-        return generate_sliding_moves(board, x, y, [(1, 1), (1, -1), (-1, 1), (-1, -1)])
+        return generate_sliding_moves(board, x, y, BISHOP_DELTAS)
     elif abs_piece == PieceType.WHITE_QUEEN:
-        return generate_sliding_moves(board, x, y, [(1, 0), (-1, 0), (0, 1), (0, -1),
-                                                    (1, 1), (1, -1), (-1, 1), (-1, -1)])
+        return generate_sliding_moves(board, x, y, QUEEN_DELTAS)
     elif abs_piece == PieceType.WHITE_KNIGHT:
         return generate_knight_moves(board, x, y)
     elif abs_piece == PieceType.WHITE_KING:
@@ -153,3 +164,138 @@ def get_legal_moves(board, from_pos):
         return generate_joker_moves(board, x, y)
 
     return []
+
+
+# Move tables, indexed by piece value + 8, from square and to square:
+#   QUIET   the piece may move there if the square is empty
+#   CAPTURE the piece may move there if an opponent stands on it
+#   BETWEEN bitboard of squares that have to be empty for the move
+SLIDING_DELTAS = {
+    PieceType.WHITE_ROOK: ROOK_DELTAS,
+    PieceType.WHITE_BISHOP: BISHOP_DELTAS,
+    PieceType.WHITE_QUEEN: QUEEN_DELTAS,
+}
+JUMPING_DELTAS = {
+    PieceType.WHITE_KNIGHT: KNIGHT_DELTAS,
+    PieceType.WHITE_KING: KING_DELTAS,
+    PieceType.WHITE_STAR: STAR_DELTAS,
+    PieceType.WHITE_JOKER: JOKER_DELTAS,
+}
+
+
+def _move_tables():
+    quiet = np.zeros((17, 36, 36), dtype=bool)
+    capture = np.zeros((17, 36, 36), dtype=bool)
+    between = np.zeros((17, 36, 36), dtype=np.int64)
+    for sign in (1, -1):
+        for x in range(6):
+            for y in range(6):
+                sq = x * 6 + y
+                for kind, deltas in SLIDING_DELTAS.items():
+                    code = sign * kind + 8
+                    for dx, dy in deltas:
+                        path = 0
+                        nx, ny = x + dx, y + dy
+                        while in_bounds(nx, ny):
+                            target = nx * 6 + ny
+                            quiet[code, sq, target] = capture[code, sq, target] = True
+                            between[code, sq, target] = path
+                            path |= 1 << target
+                            nx, ny = nx + dx, ny + dy
+                for kind, deltas in JUMPING_DELTAS.items():
+                    code = sign * kind + 8
+                    for dx, dy in deltas:
+                        nx, ny = x + dx, y + dy
+                        if in_bounds(nx, ny):
+                            quiet[code, sq, nx * 6 + ny] = capture[code, sq, nx * 6 + ny] = True
+                code = sign * PieceType.WHITE_PAWN + 8
+                direction = -sign
+                if in_bounds(x + direction, y):
+                    quiet[code, sq, (x + direction) * 6 + y] = True
+                    for ny in (y - 1, y + 1):
+                        if in_bounds(x + direction, ny):
+                            capture[code, sq, (x + direction) * 6 + ny] = True
+                if x == PAWN_START_ROW[sign > 0]:
+                    quiet[code, sq, (x + 2 * direction) * 6 + y] = True
+                    between[code, sq, (x + 2 * direction) * 6 + y] = 1 << ((x + direction) * 6 + y)
+    return quiet, capture, between
+
+
+QUIET, CAPTURE, BETWEEN = _move_tables()
+SQUARE_BITS = np.left_shift(np.int64(1), np.arange(36, dtype=np.int64))
+
+# per piece value + 8 and square, the (target, between, quiet, capture)
+# tuples of the tables above for the one-position generator
+CANDIDATES = [
+    [
+        tuple(
+            (int(target), int(BETWEEN[code, sq, target]), bool(QUIET[code, sq, target]), bool(CAPTURE[code, sq, target]))
+            for target in np.flatnonzero(QUIET[code, sq] | CAPTURE[code, sq])
+        )
+        for sq in range(36)
+    ]
+    for code in range(17)
+]
+
+
+def generate_all_moves(board, is_white):
+    """
+    All legal moves of one side as ((x, y), (nx, ny)) tuples, (row, col) like
+    get_legal_moves, in square order.
+    """
+    cells = [int(piece) for row in board for piece in row]
+    occupied = 0
+    for sq, piece in enumerate(cells):
+        if piece:
+            occupied |= 1 << sq
+    sign = 1 if is_white else -1
+    moves = []
+    for sq, piece in enumerate(cells):
+        if piece * sign <= 0:
+            continue
+        start = (sq // 6, sq % 6)
+        for target, between, quiet, capture in CANDIDATES[piece + 8][sq]:
+            if between & occupied:
+                continue
+            other = cells[target]
+            if (quiet and other == 0) or (capture and other * sign < 0):
+                moves.append((start, (target // 6, target % 6)))
+    return moves
+
+
+def legal_move_masks(boards, turns):
+    """
+    Legal moves of the side to move on many boards in one call, as an
+    (N, 36, 36) bool array indexed by from square and to square. boards is
+    (N, 6, 6) or (N, 36) of piece values, turns is (N,) with 1 (or True) for
+    white and -1 (or False) for black to move.
+    """
+    boards = np.asarray(boards, dtype=np.int8).reshape(-1, 36)
+    turns = np.asarray(turns)
+    if turns.dtype == bool:
+        turns = np.where(turns, 1, -1)
+    n = len(boards)
+    relative = boards * turns.astype(np.int8)[:, None]
+    own = relative > 0
+    empty = boards == 0
+    opponent = relative < 0
+    occupied = (~empty * SQUARE_BITS).sum(axis=1)
+    # only as many squares in this order (the mover's pieces first) as the
+    # most pieces any board has look anything up, 12 in a normal game but
+    # set-up positions can have more. Other squares among them index the
+    # empty row
+    rows = np.arange(n)[:, None]
+    width = int(own.sum(axis=1).max()) if n else 0
+    squares = np.argsort(~own, axis=1, kind="stable")[:, :width]
+    codes = boards[rows, squares].astype(np.intp) + 8
+    codes[~own[rows, squares]] = 8
+    moves = (QUIET[codes, squares] & empty[:, None, :]) | (CAPTURE[codes, squares] & opponent[:, None, :])
+    moves &= (BETWEEN[codes, squares] & occupied[:, None, None]) == 0
+    masks = np.zeros((n, 36, 36), dtype=bool)
+    masks[rows, squares] = moves
+    return masks
+
+
+def legal_move_mask(board, is_white):
+    # (36, 36) mask of one board
+    return legal_move_masks(np.asarray(board)[None], np.array([is_white]))[0]
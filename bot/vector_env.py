@@ -0,0 +1,152 @@
+import gymnasium as gym
+from gymnasium import spaces
+from gymnasium.vector import AutoresetMode
+from gymnasium.vector.utils import batch_space
+import numpy as np
+import sys
+import os
+
+# Add the project root directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from observation import NUM_PLANES, PlaneEncoder
+from utils import legal_move_masks
+from data.classes.GameState import GameState, PAWN, KING, JOKER, STATE_STRINGS
+from data.classes.Encoding import OBS_CODES
+
+# Boards are int8 arrays of the signed piece codes of GameState (and PieceType
+# in utils.py), flattened so square y * 6 + x is (x, y). Actions are
+# from_square * 36 + to_square.
+NUM_ACTIONS = 36 * 36
+MAX_MOVES = 100
+
+START_BOARD = np.array(GameState().cells, dtype=np.int8)
+
+class VectorACMChessEnv(gym.vector.VectorEnv):
+    """
+    num_envs ACM Chess games stepped together on stacked NumPy arrays. One
+    policy plays both sides, turns says whose move it is. A finished game is
+    reset within the same step: its final observation is in
+    infos["final_obs"] and the returned observation is the new game's.
+    """
+
+    metadata = {
+        "render_modes": ["ansi"],
+        "autoreset_mode": AutoresetMode.SAME_STEP,
+    }
+
+    def __init__(self, num_envs, render_mode=None, obs_mode="board"):
+        self.num_envs = num_envs
+        self.render_mode = render_mode
+        # obs_mode "planes" gives the planes of observation.py, written into
+        # one preallocated buffer that the next step overwrites
+        self.obs_mode = obs_mode
+        if obs_mode == "planes":
+            self._encoder = PlaneEncoder(num_envs)
+            self.single_observation_space = spaces.Box(low=0, high=1, shape=(NUM_PLANES, 6, 6), dtype=np.float32)
+        else:
+            self.single_observation_space = spaces.Box(low=0, high=17, shape=(6, 6), dtype=np.uint8)
+        self.single_action_space = spaces.Discrete(NUM_ACTIONS)
+        self.observation_space = batch_space(self.single_observation_space, num_envs)
+        self.action_space = batch_space(self.single_action_space, num_envs)
+
+        self.boards = np.tile(START_BOARD, (num_envs, 1))
+        # 1 when white is to move, -1 for black
+        self.turns = np.ones(num_envs, dtype=np.int8)
+        self.num_moves = np.zeros(num_envs, dtype=np.int16)
+        self.masks = legal_move_masks(self.boards, self.turns)
+        self._np_random = np.random.default_rng()
+        self._np_random_seed = -1
+        self._rows = np.arange(num_envs)
+
+    def _get_obs(self):
+        if self.obs_mode == "planes":
+            return self._encoder.encode_arrays(self.boards, self.turns, self.num_moves)
+        return OBS_CODES[self.boards.astype(np.intp) + 8].reshape(-1, 6, 6)
+
+    def _get_info(self):
+        return {
+            "action_mask": self.masks.reshape(self.num_envs, NUM_ACTIONS),
+            "turn": self.turns.copy(),
+            "num_moves": self.num_moves.copy(),
+        }
+
+    def reset(self, *, seed=None, options=None):
+        if seed is not None:
+            self._np_random, self._np_random_seed = np.random.default_rng(seed), seed
+        self.boards[:] = START_BOARD
+        self.turns[:] = 1
+        self.num_moves[:] = 0
+        self.masks = legal_move_masks(self.boards, self.turns)
+        return self._get_obs(), self._get_info()
+
+    def step(self, actions):
+        actions = np.asarray(actions, dtype=np.intp).reshape(self.num_envs)
+        rows = self._rows
+        rewards = np.zeros(self.num_envs, dtype=np.float32)
+
+        # like ACMChessEnv, an illegal action is replaced by a random legal
+        # move and costs a reward of -1
+        flat_masks = self.masks.reshape(self.num_envs, NUM_ACTIONS)
+        illegal = ~flat_masks[rows, actions]
+        if illegal.any():
+            scores = self._np_random.random((int(illegal.sum()), NUM_ACTIONS)) * flat_masks[illegal]
+            actions[illegal] = scores.argmax(axis=1)
+            rewards[illegal] = -1
+
+        start = actions // 36
+        end = actions % 36
+        pieces = self.boards[rows, start]
+        captured = self.boards[rows, end]
+        # pawns promote into a Joker on the last rank
+        promote = (pieces == PAWN) & (end < 6) | (pieces == -PAWN) & (end >= 30)
+        pieces = np.where(promote, pieces * JOKER, pieces)
+        self.boards[rows, end] = pieces
+        self.boards[rows, start] = 0
+        self.turns = -self.turns
+        self.num_moves += 1
+        self.masks = legal_move_masks(self.boards, self.turns)
+
+        # capturing the king wins. An opponent left without a move ends the
+        # game as a draw (reward 0) like in Match.py, rules.md has no such loss
+        won = (captured == KING) | (captured == -KING)
+        stuck = ~won & ~self.masks.reshape(self.num_envs, NUM_ACTIONS).any(axis=1)
+        terminations = won | stuck
+        truncations = ~terminations & (self.num_moves >= MAX_MOVES)
+        rewards[won] = 1
+
+        obs = self._get_obs()
+        done = terminations | truncations
+        if done.any():
+            final_obs = obs.copy()
+            self.boards[done] = START_BOARD
+            self.turns[done] = 1
+            self.num_moves[done] = 0
+            self.masks[done] = legal_move_masks(self.boards[done], self.turns[done])
+            obs = self._get_obs()
+            infos = self._get_info()
+            infos["final_obs"] = final_obs
+            infos["_final_obs"] = done
+        else:
+            infos = self._get_info()
+        return obs, rewards, terminations, truncations, infos
+
+    def render(self):
+        if self.render_mode == "ansi":
+            output = ""
+            for board in self.boards:
+                for y in range(6):
+                    row = [STATE_STRINGS[int(code)] for code in board[y * 6:y * 6 + 6]]
+                    output += ' '.join(['__' if x == '' else x for x in row]) + "\n"
+                output += "\n"
+            return output
+
+    def close(self, **kwargs):
+        pass
+
+    @property
+    def np_random(self):
+        return self._np_random
+
+    @property
+    def np_random_seed(self):
+        return self._np_random_seed
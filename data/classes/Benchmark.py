@@ -0,0 +1,155 @@
+# /* Benchmark.py
+# Times bots' move() on a fixed suite of positions. Every position gets a new
+# bot, so nothing is carried over from the previous one, and the global random
+# module is seeded before each call so random tie-breaks repeat. Bots that
+# keep a node count (self.nodes) and the depth they finished
+# (self.completed_depth) have those recorded too.
+#
+# A time-limited search reaches a depth that depends on the machine. Giving a
+# depth instead sets self.depth on bots that search to one and lifts their
+# time limit, so nodes, depth and moves repeat exactly and only the time
+# changes when the search gets faster.
+
+import json
+import platform
+import random
+import time
+
+from data.classes.Board import Board
+from data.classes.Encoding import START_NOTATION
+from data.classes.Match import load_bot
+
+# (name, position in the notation of Encoding.py)
+SUITE = [
+    ("start", START_NOTATION),
+    ("opening", "rnq1bs/ppk1pp/PPpp2/2P2P/1Q1PP1/RN1KBS w 10 10"),
+    ("open centre", "2qkb1/2pppp/rp1PNs/P3nS/P1P1KP/R1Q1B1 w 0 14"),
+    ("exposed kings", "r1q1ks/ppp1p1/Nnb2p/3PpS/PPPK1P/R1Q1B1 b 3 15"),
+    ("middlegame", "rq2bs/pp2p1/1p1kP1/1P2nS/P1P2P/2RKB1 w 0 18"),
+    ("advanced pawns", "1rq1bs/p1p2p/4p1/NP1P1k/RQp1PP/3KBS b 2 21"),
+    ("black joker", "1n3s/rQpk2/p1P1pp/N5/P1KPjB/3R2 w 5 26"),
+    ("queens", "3kbs/rp1S2/p2PNP/4p1/PPKB2/1RQ1q1 b 0 29"),
+    ("endgame", "3n1s/pN1k2/1K1p1p/1P3P/P2p2/R3B1 b 3 41"),
+    ("promotion", "r1k3/1P2P1/6/6/1p2p1/3K1R w 0 20"),
+    ("king capture", "3k2/2Q3/6/6/6/3K2 w 0 50"),
+]
+
+# fraction a bot may get slower (total seconds) before compare reports a
+# regression
+MAX_SLOWDOWN = 0.10
+# changes in total seconds smaller than this are timer noise, not reported
+MIN_CHANGE = 0.01
+
+
+def bench_position(bot_class, notation, seed, depth=None, repeat=1):
+    # one result dict, the fastest of repeat runs
+    best = None
+    for _ in range(repeat):
+        bot = bot_class()
+        if depth is not None and hasattr(bot, "depth"):
+            bot.depth = depth
+            bot.time_limit = float("inf")
+        board = Board.from_position(notation)
+        board.verbose = False
+        random.seed(seed)
+        start = time.perf_counter()
+        move = bot.move(board.turn, board)
+        seconds = time.perf_counter() - start
+        if best is None or seconds < best["seconds"]:
+            nodes = getattr(bot, "nodes", None)
+            best = {
+                "move": [list(square) for square in move] if move is not None else None,
+                "seconds": seconds,
+                "nodes": nodes,
+                "nps": nodes / seconds if nodes is not None and seconds > 0 else None,
+                "depth": getattr(bot, "completed_depth", None),
+            }
+    return best
+
+
+def run(names, suite=SUITE, seed=0, depth=None, repeat=1):
+    """
+    Benchmarks the named bots (modules in data/classes/bots) on every suite
+    position. Returns a JSON-ready dict: the settings, a result per bot and
+    position, and per bot totals.
+    """
+    results = []
+    totals = {}
+    for name in names:
+        bot_class = load_bot(name)
+        total = {"seconds": 0.0, "nodes": 0, "positions": 0}
+        for position, notation in suite:
+            result = bench_position(bot_class, notation, seed, depth, repeat)
+            result.update(bot=name, position=position)
+            results.append(result)
+            total["seconds"] += result["seconds"]
+            total["positions"] += 1
+            if result["nodes"] is None:
+                total["nodes"] = None
+            elif total["nodes"] is not None:
+                total["nodes"] += result["nodes"]
+        nodes = total["nodes"]
+        total["nps"] = nodes / total["seconds"] if nodes is not None and total["seconds"] > 0 else None
+        totals[name] = total
+    return {
+        "settings": {
+            "seed": seed,
+            "depth": depth,
+            "repeat": repeat,
+            "suite": [position for position, _ in suite],
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+        },
+        "results": results,
+        "totals": totals,
+    }
+
+
+def save(report, path):
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(report, baseline, max_slowdown=MAX_SLOWDOWN):
+    """
+    Differences between two reports of run, as a list of (bot, kind,
+    message) with kind one of:
+      slower     total seconds grew by more than max_slowdown (and
+                 MIN_CHANGE), or by MIN_CHANGE from a zero baseline
+      faster     total seconds shrank by more than max_slowdown
+      different  a position's move, nodes or depth changed
+      settings   the reports were run with a different seed, depth or suite
+    Bots or positions missing from either report are skipped.
+    """
+    output = []
+    for field in ("seed", "depth", "suite"):
+        if report["settings"][field] != baseline["settings"][field]:
+            output.append(("*", "settings", f"{field} {baseline['settings'][field]} -> {report['settings'][field]}"))
+    old_results = {(result["bot"], result["position"]): result for result in baseline["results"]}
+    for name, total in report["totals"].items():
+        old = baseline["totals"].get(name)
+        if old is None or abs(total["seconds"] - old["seconds"]) < MIN_CHANGE:
+            continue
+        if old["seconds"] <= 0:
+            # no ratio to a zero baseline, but it did get MIN_CHANGE slower
+            output.append((name, "slower", f"{old['seconds']:.3f}s -> {total['seconds']:.3f}s"))
+            continue
+        change = total["seconds"] / old["seconds"] - 1
+        message = f"{old['seconds']:.3f}s -> {total['seconds']:.3f}s ({change:+.1%})"
+        if change > max_slowdown:
+            output.append((name, "slower", message))
+        elif change < -max_slowdown:
+            output.append((name, "faster", message))
+    for result in report["results"]:
+        old = old_results.get((result["bot"], result["position"]))
+        if old is None:
+            continue
+        for field in ("move", "nodes", "depth"):
+            if result[field] != old[field]:
+                output.append((result["bot"], "different", f"{result['position']}: {field} {old[field]} -> {result[field]}"))
+    return output
@@ -0,0 +1,234 @@
+# /* Bitboard.py
+# 36-bit bitboard move generator. Bit y * 6 + x is the square (x, y), the same
+# numbering GameState uses. Jumping pieces (King, Knight, Star, Joker) and pawns
+# look their targets up in precomputed tables. Sliding pieces look theirs up by
+# the occupancy of their rays, in tables built once from per-direction rays.
+
+from data.classes.GameState import (
+    WHITE,
+    BLACK,
+    PAWN,
+    KNIGHT,
+    BISHOP,
+    ROOK,
+    QUEEN,
+    KING,
+    JOKER,
+    STAR,
+    POSITIONS,
+    ORTHOGONAL,
+    DIAGONAL,
+    KNIGHT_DELTAS,
+    STAR_DELTAS,
+    JOKER_DELTAS,
+    ALL_DIRECTIONS,
+)
+
+FULL = (1 << 36) - 1
+
+
+def _jumps(deltas):
+    table = []
+    for x, y in POSITIONS:
+        mask = 0
+        for dx, dy in deltas:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < 6 and 0 <= ny < 6:
+                mask |= 1 << (ny * 6 + nx)
+        table.append(mask)
+    return table
+
+
+def _ray(dx, dy):
+    table = []
+    for x, y in POSITIONS:
+        mask = 0
+        nx, ny = x + dx, y + dy
+        while 0 <= nx < 6 and 0 <= ny < 6:
+            mask |= 1 << (ny * 6 + nx)
+            nx, ny = nx + dx, ny + dy
+        table.append(mask)
+    return table
+
+
+# per direction: (ray table, whether the ray runs towards higher squares)
+RAYS = {(dx, dy): (_ray(dx, dy), dy * 6 + dx > 0) for dx, dy in ALL_DIRECTIONS}
+ROOK_RAYS = [RAYS[d] for d in ORTHOGONAL]
+BISHOP_RAYS = [RAYS[d] for d in DIAGONAL]
+
+JUMPS = {
+    KNIGHT: _jumps(KNIGHT_DELTAS),
+    KING: _jumps(ALL_DIRECTIONS),
+    STAR: _jumps(STAR_DELTAS),
+    JOKER: _jumps(JOKER_DELTAS),
+}
+
+PAWN_DIRECTION = {WHITE: -1, BLACK: 1}
+PAWN_ATTACKS = {
+    color: _jumps([(1, step), (-1, step)]) for color, step in PAWN_DIRECTION.items()
+}
+PAWN_PUSH = {color: _jumps([(0, step)]) for color, step in PAWN_DIRECTION.items()}
+PAWN_DOUBLE_PUSH = {
+    color: _jumps([(0, 2 * step)]) for color, step in PAWN_DIRECTION.items()
+}
+
+# MOVES[sq][bit] is the ((x, y), (x, y)) tuple for moving from sq to that bit,
+# so the generator never builds tuples
+MOVES = [
+    {1 << target: (POSITIONS[sq], POSITIONS[target]) for target in range(36)}
+    for sq in range(36)
+]
+
+
+def slide(sq, occupied, rays):
+    attacks = 0
+    for table, forward in rays:
+        ray = table[sq]
+        blockers = ray & occupied
+        if blockers:
+            if forward:
+                first = (blockers & -blockers).bit_length() - 1
+            else:
+                first = blockers.bit_length() - 1
+            ray ^= table[first]
+        attacks |= ray
+    return attacks
+
+
+def _subsets(mask):
+    subset = 0
+    while True:
+        yield subset
+        subset = (subset - mask) & mask
+        if subset == 0:
+            return
+
+
+def _slide_table(rays):
+    # per square: (relevant occupancy mask, {occupancy & mask: attacks})
+    masks = []
+    tables = []
+    for sq in range(36):
+        mask = 0
+        for table, forward in rays:
+            ray = table[sq]
+            # the last square of a ray never blocks anything, leave it out
+            if ray:
+                last = ray.bit_length() - 1 if forward else (ray & -ray).bit_length() - 1
+                mask |= ray & ~(1 << last)
+        masks.append(mask)
+        tables.append({occupied: slide(sq, occupied, rays) for occupied in _subsets(mask)})
+    return masks, tables
+
+
+ROOK_MASKS, ROOK_ATTACKS = _slide_table(ROOK_RAYS)
+BISHOP_MASKS, BISHOP_ATTACKS = _slide_table(BISHOP_RAYS)
+SLIDERS = {ROOK, BISHOP, QUEEN}
+
+
+def slider_attacks(kind, sq, occupied):
+    attacks = 0
+    if kind != BISHOP:
+        attacks = ROOK_ATTACKS[sq][occupied & ROOK_MASKS[sq]]
+    if kind != ROOK:
+        attacks |= BISHOP_ATTACKS[sq][occupied & BISHOP_MASKS[sq]]
+    return attacks
+
+
+def attacks(piece, sq, occupied):
+    # squares the piece on sq attacks, own pieces included (they are
+    # defended). Pawns attack diagonally only, pushes never capture
+    kind = abs(piece)
+    if kind == PAWN:
+        return PAWN_ATTACKS[WHITE if piece > 0 else BLACK][sq]
+    if kind in SLIDERS:
+        return slider_attacks(kind, sq, occupied)
+    return JUMPS[kind][sq]
+
+
+class AttackMap:
+    # what one side attacks in one position: a bitboard of all attacked
+    # squares, and per square a bitboard of the pieces attacking it
+    def __init__(self, state, color):
+        cells = state.cells
+        occupied = state.occupied[WHITE] | state.occupied[BLACK]
+        self.attacked = 0
+        self.attackers = [0] * 36
+        pieces = state.occupied[color]
+        while pieces:
+            bit = pieces & -pieces
+            pieces ^= bit
+            sq = bit.bit_length() - 1
+            targets = attacks(cells[sq], sq, occupied)
+            self.attacked |= targets
+            while targets:
+                target = targets & -targets
+                targets ^= target
+                self.attackers[target.bit_length() - 1] |= bit
+
+    def is_attacked(self, sq):
+        return self.attacked >> sq & 1 == 1
+
+    def count(self, sq):
+        return bin(self.attackers[sq]).count("1")
+
+
+def targets(state, sq):
+    # bitboard of squares the piece on sq can move to
+    piece = state.cells[sq]
+    color = WHITE if piece > 0 else BLACK
+    own = state.occupied[color]
+    kind = abs(piece)
+    if kind == PAWN:
+        opponent = state.occupied[BLACK if color == WHITE else WHITE]
+        empty = ~(own | opponent)
+        output = PAWN_PUSH[color][sq] & empty
+        if output and not state.moved >> sq & 1:
+            output |= PAWN_DOUBLE_PUSH[color][sq] & empty
+        return output | (PAWN_ATTACKS[color][sq] & opponent)
+    if kind in SLIDERS:
+        occupied = own | state.occupied[BLACK if color == WHITE else WHITE]
+        return slider_attacks(kind, sq, occupied) & ~own
+    return JUMPS[kind][sq] & ~own
+
+
+def get_all_valid_moves(state, color):
+    cells = state.cells
+    own = state.occupied[color]
+    opponent = state.occupied[BLACK if color == WHITE else WHITE]
+    occupied = own | opponent
+    empty = FULL ^ occupied
+    not_own = FULL ^ own
+    moved = state.moved
+    push, double_push, pawn_attacks = PAWN_PUSH[color], PAWN_DOUBLE_PUSH[color], PAWN_ATTACKS[color]
+    rook_masks, rook_attacks = ROOK_MASKS, ROOK_ATTACKS
+    bishop_masks, bishop_attacks = BISHOP_MASKS, BISHOP_ATTACKS
+    output = []
+    pieces = own
+    while pieces:
+        bit = pieces & -pieces
+        pieces ^= bit
+        sq = bit.bit_length() - 1
+        kind = abs(cells[sq])
+        if kind == PAWN:
+            moves = push[sq] & empty
+            if moves and not moved & bit:
+                moves |= double_push[sq] & empty
+            moves |= pawn_attacks[sq] & opponent
+        elif kind == ROOK:
+            moves = rook_attacks[sq][occupied & rook_masks[sq]] & not_own
+        elif kind == BISHOP:
+            moves = bishop_attacks[sq][occupied & bishop_masks[sq]] & not_own
+        elif kind == QUEEN:
+            moves = (
+                rook_attacks[sq][occupied & rook_masks[sq]]
+                | bishop_attacks[sq][occupied & bishop_masks[sq]]
+            ) & not_own
+        else:
+            moves = JUMPS[kind][sq] & not_own
+        table = MOVES[sq]
+        while moves:
+            target = moves & -moves
+            moves ^= target
+            output.append(table[target])
+    return output
@@ -1,3 +1,17 @@
+from data.classes.GameState import (
+    GameState,
+    START_CONFIG,
+    EMPTY,
+    PAWN,
+    KNIGHT,
+    BISHOP,
+    ROOK,
+    QUEEN,
+    KING,
+    JOKER,
+    STAR,
+)
+from data.classes.Encoding import load
 from data.classes.Square import Square
 from data.classes.pieces.Rook import Rook
 from data.classes.pieces.Bishop import Bishop
@@ -7,7 +21,20 @@ from data.classes.pieces.King import King
 from data.classes.pieces.Pawn import Pawn
 from data.classes.pieces.Star import Star
 
-# Game state checker
+PIECE_CLASSES = {
+    PAWN: Pawn,
+    KNIGHT: Knight,
+    BISHOP: Bishop,
+    ROOK: Rook,
+    QUEEN: Queen,
+    KING: King,
+    STAR: Star,
+}
+
+
+# Rendering view over a GameState. The squares and piece objects are only
+# built when something asks for them (drawing, clicks, get_piece_from_pos), so
+# creating a board for a search or a headless game costs next to nothing.
 class Board:
     def __init__(self, width, height):
         self.width = width
@@ -15,19 +42,87 @@ class Board:
         self.tile_width = width // 6
         self.tile_height = height // 6
         self.selected_piece = None
-        self.turn = "white"
-        self.config = [
-            ["bR", "bN", "bQ", "bK", "bB", "bS"],
-            ["bP", "bP", "bP", "bP", "bP", "bP"],
-            ["", "", "", "", "", "", "", ""],
-            ["", "", "", "", "", "", "", ""],
-            ["wP", "wP", "wP", "wP", "wP", "wP"],
-            ["wR", "wN", "wQ", "wK", "wB", "wS"],
-        ]
-        self.squares = self.generate_squares()
-        self.last_captured = 0
-        self.num_moves = 0
-        self.setup_board()
+        self.config = [row[:] for row in START_CONFIG]
+        self.state = GameState(self.config)
+        self._squares = None
+        # piece codes and moved bits currently shown on the squares
+        self._view = [EMPTY] * 36
+        self._view_moved = 0
+        # print the board after every move made through handle_move
+        self.verbose = True
+
+    @classmethod
+    def from_state(cls, state, width=600, height=600):
+        # a board showing the given GameState, see Encoding.py to build one
+        # from the other encodings
+        board = cls(width, height)
+        board.config = [row[:] for row in state.get_board_state()]
+        board.state = state
+        return board
+
+    @classmethod
+    def from_position(cls, position, width=600, height=600):
+        # a board set up from notation text or packed bytes (Encoding.py), or
+        # a copy of another GameState or Board's position
+        return cls.from_state(load(position), width, height)
+
+    def set_state(self, position):
+        # replaces the position, same arguments as from_position. The
+        # squares catch up the next time they are used
+        self.state = load(position)
+        self.config = [row[:] for row in self.state.get_board_state()]
+        self.selected_piece = None
+
+    # the game state lives in self.state, these keep the old attributes working
+    @property
+    def turn(self):
+        return self.state.turn
+
+    @turn.setter
+    def turn(self, value):
+        self.state.turn = value
+        self.state.hash_key = self.state.compute_hash()
+
+    @property
+    def last_captured(self):
+        return self.state.last_captured
+
+    @last_captured.setter
+    def last_captured(self, value):
+        self.state.last_captured = value
+
+    @property
+    def num_moves(self):
+        return self.state.num_moves
+
+    @num_moves.setter
+    def num_moves(self, value):
+        self.state.num_moves = value
+
+    @property
+    def hash_key(self):
+        return self.state.hash_key
+
+    @property
+    def squares(self):
+        if self._squares is None:
+            self._squares = self.generate_squares()
+        if self._view != self.state.cells or self._view_moved != self.state.moved:
+            self.setup_board()
+        return self._squares
+
+    def clone(self):
+        # a board with its own copy of the game state. Sizes and config are
+        # shared, the clone builds squares only if something draws or looks
+        # up a piece object on it, and piece images come from the shared cache
+        other = Board.__new__(Board)
+        other.__dict__.update(self.__dict__)
+        other.selected_piece = None
+        other.state = self.state.clone()
+        other._squares = None
+        other._view = [EMPTY] * 36
+        other._view_moved = 0
+        return other
 
     def generate_squares(self):
         output = []
@@ -37,62 +132,50 @@ class Board:
         return output
 
     def get_square_from_pos(self, pos):
-        for square in self.squares:
-            if (square.x, square.y) == (pos[0], pos[1]):
-                return square
+        # squares are generated row by row, so (x, y) is at y * 6 + x
+        return self.squares[pos[1] * 6 + pos[0]]
 
     def get_piece_from_pos(self, pos):
         return self.get_square_from_pos(pos).occupying_piece
 
-    def setup_board(self):
-        for y, row in enumerate(self.config):
-            for x, piece in enumerate(row):
-                if piece != "":
-                    square = self.get_square_from_pos((x, y))
-                    # looking inside contents, what piece does it have
-                    if piece[1] == "R":
-                        square.occupying_piece = Rook(
-                            (x, y), "white" if piece[0] == "w" else "black", self
-                        )
-                    # as you notice above, we put `self` as argument, or means our class Board
-                    elif piece[1] == "N":
-                        square.occupying_piece = Knight(
-                            (x, y), "white" if piece[0] == "w" else "black", self
-                        )
-                    elif piece[1] == "B":
-                        square.occupying_piece = Bishop(
-                            (x, y), "white" if piece[0] == "w" else "black", self
-                        )
-                    elif piece[1] == "Q":
-                        square.occupying_piece = Queen(
-                            (x, y), "white" if piece[0] == "w" else "black", self
-                        )
-                    elif piece[1] == "K":
-                        square.occupying_piece = King(
-                            (x, y), "white" if piece[0] == "w" else "black", self
-                        )
-                    elif piece[1] == "P":
-                        square.occupying_piece = Pawn(
-                            (x, y), "white" if piece[0] == "w" else "black", self
-                        )
-                    elif piece[1] == "S":
-                        square.occupying_piece = Star(
-                            (x, y), "white" if piece[0] == "w" else "black", self
-                        )
+    def create_piece(self, code, pos):
+        if code == EMPTY:
+            return None
+        color = "white" if code > 0 else "black"
+        if abs(code) == JOKER:
+            piece = Pawn(pos, color, self)
+            piece.promote(color, self)
+            return piece
+        return PIECE_CLASSES[abs(code)](pos, color, self)
 
+    def setup_board(self):
+        # bring the piece objects on the squares in line with the game state
+        cells = self.state.cells
+        moved = self.state.moved
+        for i, square in enumerate(self._squares):
+            if cells[i] != self._view[i]:
+                square.occupying_piece = self.create_piece(cells[i], square.pos)
+            if square.occupying_piece is not None:
+                square.occupying_piece.has_moved = bool(moved >> i & 1)
+        self._view = cells[:]
+        self._view_moved = moved
 
+    def clear_highlights(self):
+        if self._squares is not None:
+            for square in self._squares:
+                square.highlight = False
 
     def is_in_checkmate(self, color):
-        output = False
-        pieces_left = [
-            i.occupying_piece.color + i.occupying_piece.notation
-            for i in self.squares
-            if i.occupying_piece is not None
-        ]
-        return color + "K" not in pieces_left
+        return self.state.is_in_checkmate(color)
 
     def is_in_check(self, color):
-        return False
+        return self.state.is_in_check(color)
+
+    def is_attacked(self, pos, by_color):
+        return self.state.is_attacked(pos, by_color)
+
+    def attackers_of(self, pos, color=None):
+        return self.state.attackers_of(pos, color)
 
     def handle_click(self, mx, my):
         x = mx // self.tile_width
@@ -104,8 +187,6 @@ class Board:
                     self.selected_piece = clicked_square.occupying_piece
         # successfully made a move
         elif self.selected_piece.move(self, clicked_square):
-            self.num_moves += 1
-            self.turn = "white" if self.turn == "black" else "black"
             print(self.get_board_state())
 
         elif clicked_square.occupying_piece is not None:
@@ -122,46 +203,33 @@ class Board:
 
     def get_board_state(self):
         # 2d 6x6 array
-        output = [["" for _ in range(6)] for _ in range(6)]
-
-        for square in self.squares:
-            if square.occupying_piece is not None:
-                output[square.y][square.x] = (
-                    square.occupying_piece.color[0] + square.occupying_piece.notation
-                )
-            else:
-                output[square.y][square.x] = ""
-        return output
+        return self.state.get_board_state()
 
     def handle_move(self, start_pos, end_pos):
-        start_square = self.get_square_from_pos(start_pos)
-        end_square = self.get_square_from_pos(end_pos)
-
-        if start_square.occupying_piece is None:
-            return False
+        self.clear_highlights()
+        self.selected_piece = None
+        if self.state.handle_move(start_pos, end_pos):
+            if self.verbose:
+                print(self.get_board_state())
+            return True
+        return False
 
-        if start_square.occupying_piece.color != self.turn:
-            return False
+    # unchecked moves for searches, see GameState.make_move. The squares and
+    # piece objects catch up with the state the next time they are used
+    def make_move(self, move):
+        return self.state.make_move(move)
 
-        if start_square.occupying_piece.move(self, end_square):
-            self.turn = "white" if self.turn == "black" else "black"
-            print(self.get_board_state())
-            self.num_moves += 1
-            return True
+    def unmake_move(self, undo):
+        self.state.unmake_move(undo)
 
+    def apply_move(self, move):
+        self.state.apply_move(move)
 
     def alg_not_to_pos(self, alg_not):
         return (ord(alg_not[0]) - 65, int(alg_not[1]) - 1)
 
     def get_all_valid_moves(self, color):
-        output = []
-        for square in self.squares:
-            if (
-                square.occupying_piece is not None
-                and square.occupying_piece.color == color
-            ):
-                for move in square.occupying_piece.get_valid_moves(self):
-                    output.append((square.pos, move.pos))
-        return output
+        return self.state.get_all_valid_moves(color)
+
     def is_in_draw(self):
-        return self.num_moves >= 100
\ No newline at end of file
+        return self.state.is_in_draw()
@@ -0,0 +1,309 @@
+# /* Encoding.py
+# Converts positions between the encodings used around the repo:
+#   state    GameState (or the Board wrapping it)
+#   strings  get_board_state() grids, "wK", "b " for a black pawn, "" empty
+#   pieces   PieceType ints of bot/utils.py, board[row][col] (utils calls the
+#            row x and the column y, Board uses (x, y) = (col, row))
+#   obs      ACMChessEnv observation codes, P1 R2 N3 B4 Q5 K6 S7 J8, +9 for
+#            black, 0 empty
+#   notation FEN-like text, see to_notation
+#   packed   bytes, see pack
+# Every conversion goes through the flat list of piece codes in
+# GameState.cells, with lookup tables instead of per-square string handling.
+#
+# Jokers keep their own code in every encoding, so a promoted pawn stays
+# promoted. None of them records which pieces have moved; a pawn is taken as
+# unmoved exactly when it stands on its starting rank, which is the only
+# thing the moved bits decide.
+
+import struct
+
+import numpy as np
+
+from data.classes.GameState import (
+    GameState,
+    WHITE,
+    BLACK,
+    EMPTY,
+    PAWN,
+    KNIGHT,
+    BISHOP,
+    ROOK,
+    QUEEN,
+    KING,
+    JOKER,
+    STAR,
+    PIECE_LETTERS,
+    STATE_STRINGS,
+    ZOBRIST,
+    ZOBRIST_BLACK_TO_MOVE,
+)
+
+ENCODINGS = ("strings", "pieces", "obs", "notation", "packed")
+
+# get_board_state() string -> piece code. Pawns are "w " there, "wP" (the
+# letter of Board.config) is read as well
+STRING_CODES = {string: code for code, string in STATE_STRINGS.items()}
+for _letter, _kind in PIECE_LETTERS.items():
+    STRING_CODES["w" + _letter] = _kind
+    STRING_CODES["b" + _letter] = -_kind
+
+# piece code + 8 -> observation code, and back
+_OBS_KINDS = {PAWN: 1, ROOK: 2, KNIGHT: 3, BISHOP: 4, QUEEN: 5, KING: 6, STAR: 7, JOKER: 8}
+OBS_CODES = np.zeros(17, dtype=np.uint8)
+PIECE_CODES = np.zeros(18, dtype=np.int8)
+for _kind, _code in _OBS_KINDS.items():
+    OBS_CODES[_kind + 8] = _code
+    OBS_CODES[-_kind + 8] = _code + 9
+    PIECE_CODES[_code] = _kind
+    PIECE_CODES[_code + 9] = -_kind
+
+# notation letters, upper case for white
+NOTATION_LETTERS = {}
+for _letter, _kind in PIECE_LETTERS.items():
+    NOTATION_LETTERS[_kind] = _letter
+    NOTATION_LETTERS[-_kind] = _letter.lower()
+NOTATION_CODES = {letter: code for code, letter in NOTATION_LETTERS.items()}
+START_NOTATION = "rnqkbs/pppppp/6/6/PPPPPP/RNQKBS w 0 0"
+
+# packed form: PACKED header (flags, num_moves, last_captured, bitboard of
+# occupied squares in 5 bytes), then a nibble per occupied square in square
+# order, low nibble first: the piece kind - 1, plus 8 for black. 10 bytes
+# of header and at most 12 of pieces, 22 bytes for the start position
+PACKED = struct.Struct("<BHH5s")
+PACKED_BLACK_TO_MOVE = 1
+_NIBBLES = {}
+for _kind in range(PAWN, STAR + 1):
+    _NIBBLES[_kind] = _kind - 1
+    _NIBBLES[-_kind] = _kind - 1 | 8
+_NIBBLE_CODES = [0] * 16
+for _code, _nibble in _NIBBLES.items():
+    _NIBBLE_CODES[_nibble] = _code
+
+# bitboards of the squares pawns start on
+PAWN_START = {
+    WHITE: sum(1 << sq for sq in range(24, 30)),
+    BLACK: sum(1 << sq for sq in range(6, 12)),
+}
+
+
+def from_cells(cells, turn=WHITE, num_moves=0, moved=None):
+    # GameState with the given piece codes (square row * 6 + col). moved is
+    # the bitboard of moved pieces, by default every pawn off its start rank
+    state = GameState.__new__(GameState)
+    state.cells = cells = [int(code) for code in cells]
+    if len(cells) != 36:
+        raise ValueError(f"a position has 36 squares, not {len(cells)}")
+    occupied = {WHITE: 0, BLACK: 0}
+    kings = {WHITE: None, BLACK: None}
+    pawns_moved = 0
+    key = 0
+    for sq, code in enumerate(cells):
+        if code != EMPTY:
+            if not -STAR <= code <= STAR:
+                raise ValueError(f"unknown piece code {code} on square {sq}")
+            color = WHITE if code > 0 else BLACK
+            occupied[color] |= 1 << sq
+            key ^= ZOBRIST[code][sq]
+            if code == KING or code == -KING:
+                kings[color] = sq
+            elif code == PAWN or code == -PAWN:
+                if not PAWN_START[color] >> sq & 1:
+                    pawns_moved |= 1 << sq
+    state.occupied = occupied
+    state.kings = kings
+    if moved is None:
+        moved = pawns_moved
+    state.moved = moved
+    state.turn = turn
+    state.last_captured = 0
+    state.num_moves = num_moves
+    state.hash_key = key ^ ZOBRIST_BLACK_TO_MOVE if turn == BLACK else key
+    state.attack_cache = {WHITE: None, BLACK: None}
+    return state
+
+
+def _state(position):
+    # the GameState of a GameState or Board
+    return getattr(position, "state", position)
+
+
+def to_cells(position):
+    return _state(position).cells[:]
+
+
+def to_notation(position):
+    """
+    FEN-like text of a position: the rows from black's back rank (row 0) to
+    white's, separated by "/", upper case letters for white (P N B R Q K J S)
+    and digits for runs of empty squares; then the side to move ("w" or "b"),
+    the moves since the last capture and the move counter, e.g.
+    START_NOTATION. Pawns off their start rank count as moved.
+    """
+    state = _state(position)
+    cells = state.cells
+    rows = []
+    for start in range(0, 36, 6):
+        row = ""
+        empty = 0
+        for code in cells[start:start + 6]:
+            if code:
+                if empty:
+                    row += str(empty)
+                    empty = 0
+                row += NOTATION_LETTERS[code]
+            else:
+                empty += 1
+        if empty:
+            row += str(empty)
+        rows.append(row)
+    side = "w" if state.turn == WHITE else "b"
+    return f"{'/'.join(rows)} {side} {state.last_captured} {state.num_moves}"
+
+
+def from_notation(text):
+    fields = text.split()
+    if len(fields) != 4 or fields[1] not in ("w", "b"):
+        raise ValueError(f"not a position: {text!r}")
+    placement, side, last_captured, num_moves = fields
+    cells = []
+    for row in placement.split("/"):
+        size = len(cells)
+        for char in row:
+            if char in NOTATION_CODES:
+                cells.append(NOTATION_CODES[char])
+            elif char.isdigit():
+                cells.extend([EMPTY] * int(char))
+            else:
+                raise ValueError(f"unknown piece {char!r} in {text!r}")
+        if len(cells) - size != 6:
+            raise ValueError(f"row {row!r} of {text!r} is not 6 squares")
+    state = from_cells(cells, WHITE if side == "w" else BLACK, int(num_moves))
+    state.last_captured = int(last_captured)
+    return state
+
+
+def pack(position):
+    # compact bytes of a position, see PACKED
+    state = _state(position)
+    occupied = state.occupied[WHITE] | state.occupied[BLACK]
+    nibbles = [_NIBBLES[code] for code in state.cells if code]
+    if len(nibbles) % 2:
+        nibbles.append(0)
+    flags = PACKED_BLACK_TO_MOVE if state.turn == BLACK else 0
+    header = PACKED.pack(flags, state.num_moves, state.last_captured, occupied.to_bytes(5, "little"))
+    return header + bytes(nibbles[i] | nibbles[i + 1] << 4 for i in range(0, len(nibbles), 2))
+
+
+def unpack(data):
+    if len(data) < PACKED.size:
+        raise ValueError("packed position is too short")
+    flags, num_moves, last_captured, occupied = PACKED.unpack_from(data)
+    occupied = int.from_bytes(occupied, "little")
+    pieces = data[PACKED.size:]
+    if len(pieces) != (bin(occupied).count("1") + 1) // 2:
+        raise ValueError("packed position does not match its occupied squares")
+    cells = [EMPTY] * 36
+    i = 0
+    while occupied:
+        bit = occupied & -occupied
+        occupied ^= bit
+        cells[bit.bit_length() - 1] = _NIBBLE_CODES[pieces[i >> 1] >> (i & 1) * 4 & 15]
+        i += 1
+    state = from_cells(cells, BLACK if flags & PACKED_BLACK_TO_MOVE else WHITE, num_moves)
+    state.last_captured = last_captured
+    return state
+
+
+def load(position):
+    # a new GameState from a GameState, Board, notation or packed bytes
+    if isinstance(position, str):
+        return from_notation(position)
+    if isinstance(position, (bytes, bytearray, memoryview)):
+        return unpack(bytes(position))
+    return _state(position).clone()
+
+
+def from_strings(grid, turn=WHITE, num_moves=0):
+    return from_cells([STRING_CODES[cell] for row in grid for cell in row[:6]], turn, num_moves)
+
+
+def to_strings(position):
+    return _state(position).get_board_state()
+
+
+def from_pieces(board, turn=WHITE, num_moves=0):
+    # board[row][col] of PieceType ints, a nested list or a (6, 6) array
+    return from_cells(np.asarray(board, dtype=np.int8).ravel().tolist(), turn, num_moves)
+
+
+def to_pieces(position):
+    # (6, 6) int8 array, board[row][col] like bot/utils.py
+    return np.array(_state(position).cells, dtype=np.int8).reshape(6, 6)
+
+
+def from_obs(obs, turn=WHITE, num_moves=0):
+    obs = np.asarray(obs, dtype=np.intp).ravel()
+    if obs.min() < 0 or obs.max() > 17:
+        raise ValueError("observation codes are 0-17")
+    return from_cells(PIECE_CODES[obs].tolist(), turn, num_moves)
+
+
+def to_obs(position, out=None):
+    # (6, 6) uint8 array of observation codes, written into out if given
+    cells = np.array(_state(position).cells, dtype=np.intp) + 8
+    if out is None:
+        return OBS_CODES[cells].reshape(6, 6)
+    # assigned through the (6, 6) shape, so out may be any strided view
+    out[...] = OBS_CODES[cells].reshape(6, 6)
+    return out
+
+
+def pieces_to_obs(boards):
+    # any array of piece codes to observation codes, same shape
+    return OBS_CODES[np.asarray(boards, dtype=np.intp) + 8]
+
+
+def obs_to_pieces(obs):
+    return PIECE_CODES[np.asarray(obs, dtype=np.intp)]
+
+
+def decode(data, encoding, turn=WHITE, num_moves=0):
+    # GameState of a position in one of ENCODINGS. Notation and packed
+    # positions carry their own turn and counters
+    if encoding == "notation":
+        return from_notation(data)
+    if encoding == "packed":
+        return unpack(data)
+    if encoding == "strings":
+        return from_strings(data, turn, num_moves)
+    if encoding == "pieces":
+        return from_pieces(data, turn, num_moves)
+    if encoding == "obs":
+        return from_obs(data, turn, num_moves)
+    raise ValueError(f"unknown encoding {encoding!r}, expected one of {ENCODINGS}")
+
+
+def encode(position, encoding):
+    # a GameState or Board in one of ENCODINGS
+    if encoding == "strings":
+        return to_strings(position)
+    if encoding == "pieces":
+        return to_pieces(position)
+    if encoding == "obs":
+        return to_obs(position)
+    if encoding == "notation":
+        return to_notation(position)
+    if encoding == "packed":
+        return pack(position)
+    raise ValueError(f"unknown encoding {encoding!r}, expected one of {ENCODINGS}")
+
+
+def board_move_to_utils(move):
+    # ((x, y), (x, y)) of Board to ((row, col), (row, col)) of bot/utils.py
+    (fx, fy), (tx, ty) = move
+    return (fy, fx), (ty, tx)
+
+
+# swapping the coordinates is its own inverse
+utils_move_to_board = board_move_to_utils
@@ -0,0 +1,73 @@
+# /* Evaluation.py
+# Material and piece-square evaluation kept as running totals. The tables are
+# flipped for black once, when the evaluator is built, and make_move /
+# unmake_move adjust the totals by the few entries a move touches instead of
+# rescanning the board.
+
+from data.classes.GameState import WHITE, BLACK, PIECE_LETTERS, POSITIONS
+
+
+class Evaluator:
+    def __init__(self, piece_values, positional_bonus):
+        # piece_values and positional_bonus are keyed by piece letter like
+        # PIECE_VALUES and POSITIONAL_BONUS in bots/bot.py. Bonus tables are
+        # written from white's side, row 0 being the rank white promotes on
+        self.piece_values = {}
+        self.square_values = {}
+        for letter, kind in PIECE_LETTERS.items():
+            table = positional_bonus.get(letter)
+            for code in (kind, -kind):
+                self.piece_values[code] = piece_values.get(letter, 0)
+                if table is None:
+                    self.square_values[code] = [0] * 36
+                elif code > 0:
+                    self.square_values[code] = [table[y][x] for x, y in POSITIONS]
+                else:
+                    self.square_values[code] = [table[5 - y][x] for x, y in POSITIONS]
+        self.material = {WHITE: 0, BLACK: 0}
+        self.positional = {WHITE: 0, BLACK: 0}
+
+    def reset(self, state):
+        # recompute the totals for state, needed once before make_move is used
+        self.material = {WHITE: 0, BLACK: 0}
+        self.positional = {WHITE: 0, BLACK: 0}
+        for sq, code in enumerate(state.cells):
+            if code:
+                color = WHITE if code > 0 else BLACK
+                self.material[color] += self.piece_values[code]
+                self.positional[color] += self.square_values[code][sq]
+
+    def make_move(self, state, move):
+        # state.make_move that keeps the totals in step, returns the undo record
+        undo = state.make_move(move)
+        start, end, piece, captured = undo[0], undo[1], undo[2], undo[3]
+        # differs from piece when a pawn was promoted to a Joker
+        placed = state.cells[end]
+        color = WHITE if piece > 0 else BLACK
+        self.material[color] += self.piece_values[placed] - self.piece_values[piece]
+        self.positional[color] += self.square_values[placed][end] - self.square_values[piece][start]
+        if captured:
+            other = BLACK if color == WHITE else WHITE
+            self.material[other] -= self.piece_values[captured]
+            self.positional[other] -= self.square_values[captured][end]
+        return undo
+
+    def unmake_move(self, state, undo):
+        start, end, piece, captured = undo[0], undo[1], undo[2], undo[3]
+        placed = state.cells[end]
+        color = WHITE if piece > 0 else BLACK
+        self.material[color] -= self.piece_values[placed] - self.piece_values[piece]
+        self.positional[color] -= self.square_values[placed][end] - self.square_values[piece][start]
+        if captured:
+            other = BLACK if color == WHITE else WHITE
+            self.material[other] += self.piece_values[captured]
+            self.positional[other] += self.square_values[captured][end]
+        state.unmake_move(undo)
+
+    def evaluate(self, color):
+        # material plus position of color minus the opponent's
+        other = BLACK if color == WHITE else WHITE
+        return (
+            self.material[color] + self.positional[color]
+            - self.material[other] - self.positional[other]
+        )
@@ -0,0 +1,354 @@
+# /* GameState.py
+# Rules-only game state for ACM Chess. Nothing in here touches pygame, so bots,
+# the RL environment and the simulator can create and play positions without
+# paying for squares, rects or piece images. Board is a rendering view over it.
+
+import random
+
+WHITE = "white"
+BLACK = "black"
+
+# Same values as PieceType in bot/utils.py, black pieces are negative
+EMPTY = 0
+PAWN = 1
+KNIGHT = 2
+BISHOP = 3
+ROOK = 4
+QUEEN = 5
+KING = 6
+JOKER = 7
+STAR = 8
+
+START_CONFIG = [
+    ["bR", "bN", "bQ", "bK", "bB", "bS"],
+    ["bP", "bP", "bP", "bP", "bP", "bP"],
+    ["", "", "", "", "", ""],
+    ["", "", "", "", "", ""],
+    ["wP", "wP", "wP", "wP", "wP", "wP"],
+    ["wR", "wN", "wQ", "wK", "wB", "wS"],
+]
+
+# letters used by Board.config
+PIECE_LETTERS = {
+    "P": PAWN,
+    "N": KNIGHT,
+    "B": BISHOP,
+    "R": ROOK,
+    "Q": QUEEN,
+    "K": KING,
+    "J": JOKER,
+    "S": STAR,
+}
+
+# notation reported by the piece classes (pawns are a blank)
+NOTATIONS = {
+    PAWN: " ",
+    KNIGHT: "N",
+    BISHOP: "B",
+    ROOK: "R",
+    QUEEN: "Q",
+    KING: "K",
+    JOKER: "J",
+    STAR: "S",
+}
+
+# piece code -> get_board_state() string, e.g. -KING -> "bK"
+STATE_STRINGS = {EMPTY: ""}
+for _kind, _notation in NOTATIONS.items():
+    STATE_STRINGS[_kind] = "w" + _notation
+    STATE_STRINGS[-_kind] = "b" + _notation
+
+# squares are numbered y * 6 + x, POSITIONS maps them back to (x, y)
+POSITIONS = [(sq % 6, sq // 6) for sq in range(36)]
+
+
+def to_square(pos):
+    return pos[1] * 6 + pos[0]
+
+
+def _rays(deltas, sliding):
+    # per square, the squares reached in each direction in the order the
+    # piece classes used to list them
+    table = []
+    for x, y in POSITIONS:
+        rays = []
+        for dx, dy in deltas:
+            ray = []
+            nx, ny = x + dx, y + dy
+            while 0 <= nx < 6 and 0 <= ny < 6:
+                ray.append(ny * 6 + nx)
+                if not sliding:
+                    break
+                nx, ny = nx + dx, ny + dy
+            if ray:
+                rays.append(tuple(ray))
+        table.append(tuple(rays))
+    return table
+
+
+ORTHOGONAL = [(0, -1), (1, 0), (0, 1), (-1, 0)]
+DIAGONAL = [(1, -1), (1, 1), (-1, 1), (-1, -1)]
+ALL_DIRECTIONS = [(0, -1), (1, -1), (1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1)]
+KNIGHT_DELTAS = [(1, -2), (2, -1), (2, 1), (1, 2), (-1, 2), (-2, 1), (-2, -1), (-1, -2)]
+STAR_DELTAS = [(1, 1), (-1, 1), (1, -1), (-1, -1), (2, 0), (-2, 0), (0, 2), (0, -2)]
+JOKER_DELTAS = STAR_DELTAS + [(1, 0), (-1, 0), (0, 1), (0, -1), (2, 2), (-2, 2), (2, -2), (-2, -2)]
+
+RAYS = {
+    KNIGHT: _rays(KNIGHT_DELTAS, False),
+    BISHOP: _rays(DIAGONAL, True),
+    ROOK: _rays(ORTHOGONAL, True),
+    QUEEN: _rays(ALL_DIRECTIONS, True),
+    KING: _rays(ALL_DIRECTIONS, False),
+    JOKER: _rays(JOKER_DELTAS, False),
+    STAR: _rays(STAR_DELTAS, False),
+}
+
+# pawn pushes (one then two squares) and diagonal captures, per square
+PAWN_PUSHES = {
+    WHITE: [tuple(ny * 6 + x for ny in (y - 1, y - 2) if ny >= 0) for x, y in POSITIONS],
+    BLACK: [tuple(ny * 6 + x for ny in (y + 1, y + 2) if ny < 6) for x, y in POSITIONS],
+}
+PAWN_CAPTURES = {
+    WHITE: [tuple((y - 1) * 6 + nx for nx in (x + 1, x - 1) if 0 <= nx < 6 and y > 0) for x, y in POSITIONS],
+    BLACK: [tuple((y + 1) * 6 + nx for nx in (x + 1, x - 1) if 0 <= nx < 6 and y < 5) for x, y in POSITIONS],
+}
+
+# Zobrist keys: one 64-bit number per (piece code, square) and one for black
+# to move. Pawns and Jokers have different codes, so a promotion changes the
+# key. Moved bits are left out, a pawn is unmoved exactly when it is still on
+# its starting rank. Seeded so keys are the same in every process.
+_zobrist_random = random.Random(0x6C6D)
+ZOBRIST = {
+    code: [_zobrist_random.getrandbits(64) for _ in range(36)]
+    for code in range(-STAR, STAR + 1)
+    if code != EMPTY
+}
+ZOBRIST_BLACK_TO_MOVE = _zobrist_random.getrandbits(64)
+
+
+class GameState:
+    def __init__(self, config=None):
+        if config is None:
+            config = START_CONFIG
+        # piece code per square, see PIECE_LETTERS
+        self.cells = [EMPTY] * 36
+        for y, row in enumerate(config):
+            for x, piece in enumerate(row[:6]):
+                if piece != "":
+                    code = PIECE_LETTERS[piece[1]]
+                    self.cells[y * 6 + x] = code if piece[0] == "w" else -code
+        # bitboard of each side's pieces (the per-side piece sets, kept up to
+        # date on every move and capture) and the square of each king, None
+        # once it has been captured
+        self.occupied = {WHITE: 0, BLACK: 0}
+        self.kings = {WHITE: None, BLACK: None}
+        for sq, code in enumerate(self.cells):
+            if code != EMPTY:
+                color = WHITE if code > 0 else BLACK
+                self.occupied[color] |= 1 << sq
+                if abs(code) == KING:
+                    self.kings[color] = sq
+        # bit per square whose piece has already moved (pawn double steps)
+        self.moved = 0
+        self.turn = WHITE
+        self.last_captured = 0
+        self.num_moves = 0
+        self.hash_key = self.compute_hash()
+        # per side, (hash_key, Bitboard.AttackMap) of the last position asked
+        self.attack_cache = {WHITE: None, BLACK: None}
+
+    def compute_hash(self):
+        # full Zobrist key of the position, make_move keeps hash_key in step
+        # with this incrementally
+        key = ZOBRIST_BLACK_TO_MOVE if self.turn == BLACK else 0
+        for sq, code in enumerate(self.cells):
+            if code != EMPTY:
+                key ^= ZOBRIST[code][sq]
+        return key
+
+    def clone(self):
+        # copies the mutable state only, the move tables are module level
+        other = GameState.__new__(GameState)
+        other.cells = self.cells[:]
+        other.occupied = self.occupied.copy()
+        other.kings = self.kings.copy()
+        other.moved = self.moved
+        other.turn = self.turn
+        other.last_captured = self.last_captured
+        other.num_moves = self.num_moves
+        other.hash_key = self.hash_key
+        other.attack_cache = self.attack_cache.copy()
+        return other
+
+    def get_piece(self, pos):
+        return self.cells[pos[1] * 6 + pos[0]]
+
+    def get_pieces(self, color):
+        # squares of the given side's pieces
+        output = []
+        pieces = self.occupied[color]
+        while pieces:
+            bit = pieces & -pieces
+            pieces ^= bit
+            output.append(bit.bit_length() - 1)
+        return output
+
+    def get_targets(self, sq):
+        # squares the piece on sq can move to, in the order the piece classes
+        # listed them. Bitboard.py is the fast generator, this one is kept as
+        # the reference it is checked against
+        cells = self.cells
+        piece = cells[sq]
+        output = []
+        if piece == PAWN or piece == -PAWN:
+            color = WHITE if piece > 0 else BLACK
+            pushes = PAWN_PUSHES[color][sq]
+            if self.moved >> sq & 1:
+                pushes = pushes[:1]
+            for target in pushes:
+                if cells[target] != EMPTY:
+                    break
+                output.append(target)
+            for target in PAWN_CAPTURES[color][sq]:
+                if cells[target] * piece < 0:
+                    output.append(target)
+            return output
+        for ray in RAYS[abs(piece)][sq]:
+            for target in ray:
+                other = cells[target]
+                if other == EMPTY:
+                    output.append(target)
+                else:
+                    if other * piece < 0:
+                        output.append(target)
+                    break
+        return output
+
+    def get_attack_map(self, color):
+        # built once per position and side, a search that makes and unmakes
+        # moves gets it rebuilt only when it asks in a new position
+        cached = self.attack_cache[color]
+        if cached is not None and cached[0] == self.hash_key:
+            return cached[1]
+        attack_map = Bitboard.AttackMap(self, color)
+        self.attack_cache[color] = (self.hash_key, attack_map)
+        return attack_map
+
+    def is_attacked(self, pos, by_color):
+        return self.get_attack_map(by_color).is_attacked(pos[1] * 6 + pos[0])
+
+    def attackers_of(self, pos, color=None):
+        # positions of the pieces attacking pos, of one side or of both
+        sq = pos[1] * 6 + pos[0]
+        output = []
+        for side in (WHITE, BLACK) if color is None else (color,):
+            attackers = self.get_attack_map(side).attackers[sq]
+            while attackers:
+                bit = attackers & -attackers
+                attackers ^= bit
+                output.append(POSITIONS[bit.bit_length() - 1])
+        return output
+
+    def get_valid_moves(self, pos):
+        sq = pos[1] * 6 + pos[0]
+        if self.cells[sq] == EMPTY:
+            return []
+        return [POSITIONS[target] for target in self.get_targets(sq)]
+
+    def get_all_valid_moves(self, color):
+        return Bitboard.get_all_valid_moves(self, color)
+
+    def make_move(self, move):
+        # plays a move without checking it, passes the turn and returns the
+        # undo record unmake_move needs to take it back. The record starts
+        # with (start square, end square, piece, captured piece), which
+        # Evaluation.py reads
+        (fx, fy), (tx, ty) = move
+        start = fy * 6 + fx
+        end = ty * 6 + tx
+        cells = self.cells
+        piece = cells[start]
+        captured = cells[end]
+        undo = (start, end, piece, captured, self.moved, self.last_captured, self.hash_key)
+        occupied = self.occupied
+        key = self.hash_key ^ ZOBRIST_BLACK_TO_MOVE ^ ZOBRIST[piece][start]
+        if captured != EMPTY:
+            key ^= ZOBRIST[captured][end]
+            occupied[WHITE if captured > 0 else BLACK] ^= 1 << end
+            if captured == KING or captured == -KING:
+                self.kings[WHITE if captured > 0 else BLACK] = None
+            self.last_captured = 0
+        else:
+            self.last_captured += 1
+        occupied[WHITE if piece > 0 else BLACK] ^= (1 << start) | (1 << end)
+        if piece == KING or piece == -KING:
+            self.kings[WHITE if piece > 0 else BLACK] = end
+        # pawns promote into a Joker on the last rank
+        if (piece == PAWN and ty == 0) or (piece == -PAWN and ty == 5):
+            piece = JOKER if piece > 0 else -JOKER
+        cells[end] = piece
+        cells[start] = EMPTY
+        self.hash_key = key ^ ZOBRIST[piece][end]
+        self.moved = (self.moved & ~(1 << start)) | (1 << end)
+        self.turn = BLACK if self.turn == WHITE else WHITE
+        self.num_moves += 1
+        return undo
+
+    def unmake_move(self, undo):
+        # takes back the move make_move returned undo for. Moves have to be
+        # unmade in the reverse order they were made
+        start, end, piece, captured, moved, last_captured, hash_key = undo
+        cells = self.cells
+        occupied = self.occupied
+        # piece is the code from before the move, so a promotion is undone too
+        cells[start] = piece
+        cells[end] = captured
+        occupied[WHITE if piece > 0 else BLACK] ^= (1 << start) | (1 << end)
+        if piece == KING or piece == -KING:
+            self.kings[WHITE if piece > 0 else BLACK] = start
+        if captured != EMPTY:
+            occupied[WHITE if captured > 0 else BLACK] ^= 1 << end
+            if captured == KING or captured == -KING:
+                self.kings[WHITE if captured > 0 else BLACK] = end
+        self.moved = moved
+        self.last_captured = last_captured
+        self.hash_key = hash_key
+        self.turn = BLACK if self.turn == WHITE else WHITE
+        self.num_moves -= 1
+
+    def apply_move(self, move):
+        # make_move for callers that never take the move back
+        self.make_move(move)
+
+    def handle_move(self, start_pos, end_pos):
+        if not (0 <= start_pos[0] < 6 and 0 <= start_pos[1] < 6):
+            return False
+        if not (0 <= end_pos[0] < 6 and 0 <= end_pos[1] < 6):
+            return False
+        piece = self.get_piece(start_pos)
+        if piece == EMPTY:
+            return False
+        if (piece > 0) != (self.turn == WHITE):
+            return False
+        if not Bitboard.targets(self, to_square(start_pos)) >> to_square(end_pos) & 1:
+            return False
+        self.apply_move((start_pos, end_pos))
+        return True
+
+    def is_in_checkmate(self, color):
+        # the game is lost once the king has been captured
+        return self.kings[color] is None
+
+    def is_in_check(self, color):
+        return False
+
+    def is_in_draw(self):
+        return self.num_moves >= 100
+
+    def get_board_state(self):
+        cells = self.cells
+        return [[STATE_STRINGS[code] for code in cells[y * 6:y * 6 + 6]] for y in range(6)]
+
+
+# imported last, Bitboard builds its tables from the constants above
+from data.classes import Bitboard
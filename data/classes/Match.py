@@ -0,0 +1,195 @@
+# /* Match.py
+# Headless games between bots: no window, no drawing and no per-move output,
+# only the result of each game. Bots get a Board like in simulator.py, but a
+# copy of it, so a bot trying moves on it cannot change the game. As on the
+# evaluation server, an illegal move (or a bot raising an error) is replaced
+# by a random legal move, and so is a move that took longer than the time
+# limit when one is set. Every move call is timed, see latency_report.
+
+import importlib
+import random
+import time
+
+from data.classes.Board import Board
+from data.classes.GameState import WHITE, BLACK
+
+BOARD_SIZE = (600, 600)
+
+# the evaluation server's limit per move, in seconds
+TIME_LIMIT = 0.1
+
+PHASES = ("opening", "middlegame", "endgame")
+# the first OPENING_MOVES moves of a game are the opening, positions with at
+# most ENDGAME_PIECES pieces left (of 24) the endgame
+OPENING_MOVES = 12
+ENDGAME_PIECES = 12
+
+
+def load_bot(name):
+    # the Bot class of data/classes/bots/<name>.py
+    return importlib.import_module(f"data.classes.bots.{name}").Bot
+
+
+def game_over(board):
+    # same order of checks as simulator.py
+    if board.is_in_checkmate("black"):
+        return "white"
+    if board.is_in_checkmate("white"):
+        return "black"
+    if board.is_in_draw():
+        return "draw"
+    return None
+
+
+def game_phase(state):
+    if state.num_moves < OPENING_MOVES:
+        return "opening"
+    pieces = bin(state.occupied[WHITE] | state.occupied[BLACK]).count("1")
+    if pieces <= ENDGAME_PIECES:
+        return "endgame"
+    return "middlegame"
+
+
+def play_game(white_bot, black_bot, rng=random, time_limit=None):
+    # plays one game between two Bot instances. Returns a dict with the result
+    # ('white', 'black' or 'draw'), the number of moves, the time taken, how
+    # many moves of each side had to be replaced, how many of those were too
+    # slow, and a (side, phase, seconds) latency for every move call.
+    # time_limit, in seconds, enforces a deadline like the evaluation server:
+    # a bot cannot be interrupted, but a late answer is thrown away
+    board = Board(*BOARD_SIZE)
+    board.verbose = False
+    bots = {WHITE: white_bot, BLACK: black_bot}
+    replaced = {WHITE: 0, BLACK: 0}
+    late = {WHITE: 0, BLACK: 0}
+    latencies = []
+    start = time.perf_counter()
+    result = None
+    while result is None:
+        side = board.turn
+        view = board.clone()
+        phase = game_phase(board.state)
+        # perf_counter is monotonic, unlike time.time
+        move_start = time.perf_counter()
+        try:
+            move = bots[side].move(side, view)
+            error = False
+        except Exception:
+            error = True
+        elapsed = time.perf_counter() - move_start
+        latencies.append((side, phase, elapsed))
+        if error:
+            valid = False
+        elif time_limit is not None and elapsed > time_limit:
+            late[side] += 1
+            valid = False
+        else:
+            try:
+                valid = board.state.handle_move(*move)
+            except Exception:
+                valid = False
+        if not valid:
+            moves = board.get_all_valid_moves(side)
+            if not moves:
+                # rules.md only ends a game on a king capture or the move
+                # limit, a side left without a move cannot play on: a draw
+                result = "draw"
+                break
+            replaced[side] += 1
+            board.state.apply_move(rng.choice(moves))
+        result = game_over(board)
+    return {
+        "result": result,
+        "moves": board.num_moves,
+        "seconds": time.perf_counter() - start,
+        "replaced": replaced,
+        "late": late,
+        "latencies": latencies,
+    }
+
+
+def percentile(values, p):
+    # nearest-rank percentile of sorted values
+    if not values:
+        return 0.0
+    rank = max(1, -(-len(values) * p // 100))
+    return values[int(rank) - 1]
+
+
+def latency_report(samples):
+    # samples maps a key (a bot, a bot and phase, ...) to move times in
+    # seconds, returns per key the count, p50, p95, p99 and max
+    report = {}
+    for key, values in samples.items():
+        values = sorted(values)
+        report[key] = {
+            "count": len(values),
+            "p50": percentile(values, 50),
+            "p95": percentile(values, 95),
+            "p99": percentile(values, 99),
+            "max": values[-1] if values else 0.0,
+        }
+    return report
+
+
+def game_latencies(games):
+    # move times of the given games by bot and by (bot, phase), the bots
+    # being named by the games' 'white' and 'black' entries
+    samples = {}
+    for game in games:
+        for side, phase, seconds in game["latencies"]:
+            name = game[side]
+            samples.setdefault(name, []).append(seconds)
+            samples.setdefault((name, phase), []).append(seconds)
+    return samples
+
+
+def print_latencies(report, names):
+    # one line per bot and per bot and game phase, times in milliseconds
+    print(f"{'move time (ms)':<28} {'moves':>6} {'p50':>7} {'p95':>7} {'p99':>7} {'max':>7}")
+    for key, label in names:
+        for row_key, row_label in [(key, label)] + [((key, phase), f"  {phase}") for phase in PHASES]:
+            if row_key not in report:
+                continue
+            row = report[row_key]
+            print(
+                f"{row_label:<28} {row['count']:>6} {row['p50'] * 1000:>7.2f} {row['p95'] * 1000:>7.2f} "
+                f"{row['p99'] * 1000:>7.2f} {row['max'] * 1000:>7.2f}"
+            )
+
+
+def play_match(bot1_class, bot2_class, games, alternate=False, seed=None, log=None, time_limit=None):
+    # plays games between bot1 and bot2. Like simulator.py bot1 is black and
+    # bot2 white, with alternate they swap colours every game. log, if given,
+    # is called with a line per finished game. Returns (totals, games), totals
+    # counting bot1 wins, bot2 wins and draws, games the per game results with
+    # 'white' and 'black' naming the bot ('bot1'/'bot2') that played them.
+    # time_limit is passed on to play_game
+    rng = random.Random(seed)
+    if seed is not None:
+        # bots draw from the random module
+        random.seed(seed)
+    totals = {"bot1": 0, "bot2": 0, "draw": 0}
+    results = []
+    for i in range(games):
+        if alternate and i % 2:
+            players = {WHITE: "bot1", BLACK: "bot2"}
+        else:
+            players = {WHITE: "bot2", BLACK: "bot1"}
+        bots = {
+            name: cls() for name, cls in (("bot1", bot1_class), ("bot2", bot2_class))
+        }
+        game = play_game(bots[players[WHITE]], bots[players[BLACK]], rng, time_limit)
+        game["game"] = i + 1
+        game["white"] = players[WHITE]
+        game["black"] = players[BLACK]
+        winner = "draw" if game["result"] == "draw" else players[game["result"]]
+        game["winner"] = winner
+        totals[winner] += 1
+        results.append(game)
+        if log is not None:
+            log(
+                f"game {i + 1}: {winner} "
+                f"({game['moves']} moves, {game['seconds']:.2f}s)"
+            )
+    return totals, results
@@ -0,0 +1,77 @@
+# /* MoveOrdering.py
+# Move ordering for the alpha-beta bots. Moves are tried in this order:
+#   1. the transposition table move
+#   2. captures, most valuable victim first, then least valuable attacker
+#   3. the two killer moves of the ply (quiet moves that caused a cutoff)
+#   4. all other moves by their history score
+
+from data.classes.GameState import PIECE_LETTERS
+
+TT_MOVE_SCORE = 1 << 40
+CAPTURE_SCORE = 1 << 30
+KILLER_SCORE = 1 << 22
+# history scores are halved once one reaches this, so they stay below killers
+HISTORY_LIMIT = 1 << 20
+
+
+class MoveOrderer:
+    def __init__(self, piece_values, max_ply=128):
+        # piece_values maps piece letters ('P', 'N', ...) to values, like
+        # PIECE_VALUES in bots/bot.py
+        self.values = [0] * 9
+        for letter, value in piece_values.items():
+            self.values[PIECE_LETTERS[letter]] = value
+        # victim value times this always outweighs the attacker value
+        self.victim_weight = max(self.values) + 1
+        self.max_ply = max_ply
+        self.killers = [[None, None] for _ in range(max_ply)]
+        # indexed by from square * 36 + to square
+        self.history = [0] * (36 * 36)
+
+    def new_search(self):
+        # killers are per ply from the root, so they do not carry over to the
+        # next move. History is kept, but older results count for less
+        self.killers = [[None, None] for _ in range(self.max_ply)]
+        self.history = [score >> 1 for score in self.history]
+
+    def order(self, cells, moves, ply, tt_move=None):
+        # cells is GameState.cells of the position the moves belong to
+        values = self.values
+        victim_weight = self.victim_weight
+        history = self.history
+        killer, second_killer = self.killers[ply] if ply < self.max_ply else (None, None)
+        scored = []
+        for move in moves:
+            (fx, fy), (tx, ty) = move
+            start = fy * 6 + fx
+            end = ty * 6 + tx
+            victim = cells[end]
+            if move == tt_move:
+                score = TT_MOVE_SCORE
+            elif victim:
+                score = CAPTURE_SCORE + values[abs(victim)] * victim_weight - values[abs(cells[start])]
+            elif move == killer:
+                score = KILLER_SCORE
+            elif move == second_killer:
+                score = KILLER_SCORE - 1
+            else:
+                score = history[start * 36 + end]
+            scored.append((score, move))
+        scored.sort(reverse=True)
+        return [move for _, move in scored]
+
+    def cutoff(self, cells, move, ply, depth):
+        # called when move caused a beta cutoff, captures are already
+        # ordered by MVV-LVA so only quiet moves are remembered
+        (fx, fy), (tx, ty) = move
+        if cells[ty * 6 + tx]:
+            return
+        if ply < self.max_ply:
+            killers = self.killers[ply]
+            if killers[0] != move:
+                killers[1] = killers[0]
+                killers[0] = move
+        index = (fy * 6 + fx) * 36 + ty * 6 + tx
+        self.history[index] += depth * depth
+        if self.history[index] >= HISTORY_LIMIT:
+            self.history = [score >> 1 for score in self.history]
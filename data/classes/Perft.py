@@ -0,0 +1,192 @@
+# /* Perft.py
+# Move generation counts. perft walks every line of play to a fixed depth and
+# counts the positions at the end, so two generators that agree on every
+# count up to a depth agree on every position reached on the way. Games end
+# like in Match.py: once a king is captured or at the move limit, those
+# positions have no moves.
+#
+# The generators checked against each other:
+#   reference  GameState.get_targets, the plain Python rules the piece
+#              objects of Board ask
+#   bitboard   Bitboard.get_all_valid_moves, what Board and the bots use
+#   utils      generate_all_moves of bot/utils.py, row/col boards
+#   vector     legal_move_masks of bot/utils.py, whole levels of the tree at
+#              once on NumPy arrays
+
+import time
+
+from data.classes import Bitboard
+from data.classes.Encoding import START_NOTATION, from_notation, to_cells, to_notation
+from data.classes.GameState import WHITE, BLACK, KING, JOKER, PAWN, POSITIONS
+
+# (name, notation, leaf counts from depth 1 on) of positions that exercise the
+# awkward rules. Counts come from the reference generator
+CORPUS = [
+    ("start", START_NOTATION, (15, 214, 3451, 53376)),
+    # pawns one push or one capture away from becoming Jokers, for both sides
+    ("promotion", "r1k3/1P2P1/6/6/1p2p1/3K1R w 0 20", (15, 190, 2970, 44594)),
+    # Stars jumping two squares over pieces of either colour
+    ("stars", "s1n1k1/1p1p2/2S3/1P1s2/6/K4S b 0 30", (20, 261, 4817, 63980)),
+    # double steps blocked on the first or the second square, and pawns off
+    # their start rank that have used theirs
+    ("double steps", "rnqkbs/p1p1pp/1p2N1/P1n3/1P1P1P/R1QKBS w 0 8", (22, 562, 12418, 293523)),
+    # Jokers of both sides next to the kings
+    ("jokers", "j1k2j/6/2J3/3p2/1P4/J2K2 w 0 40", (28, 456, 11411, 218723)),
+    # the queen can take the king, that line ends the game
+    ("king capture", "3k2/2Q3/6/6/6/3K2 w 0 50", (22, 105, 2058, 13397)),
+    # the move limit ends the game after one more move
+    ("move limit", "rnqkbs/pppppp/6/6/PPPPPP/RNQKBS w 0 99", (15, 0, 0, 0)),
+]
+
+
+def game_over(state):
+    return state.kings[WHITE] is None or state.kings[BLACK] is None or state.is_in_draw()
+
+
+def reference_moves(state):
+    return [
+        (POSITIONS[sq], POSITIONS[target])
+        for sq in state.get_pieces(state.turn)
+        for target in state.get_targets(sq)
+    ]
+
+
+def bitboard_moves(state):
+    return Bitboard.get_all_valid_moves(state, state.turn)
+
+
+def utils_moves(state):
+    # bot/utils.py takes rows of PieceType ints and gives (row, col) moves
+    from bot.utils import generate_all_moves
+
+    cells = state.cells
+    board = [cells[start:start + 6] for start in range(0, 36, 6)]
+    return [((fy, fx), (ty, tx)) for (fx, fy), (tx, ty) in generate_all_moves(board, state.turn == WHITE)]
+
+
+GENERATORS = {
+    "reference": reference_moves,
+    "bitboard": bitboard_moves,
+    "utils": utils_moves,
+}
+
+
+def perft(state, depth, generator=bitboard_moves):
+    # positions reached after depth moves, made and unmade on state
+    if depth == 0:
+        return 1
+    if game_over(state):
+        return 0
+    moves = generator(state)
+    if depth == 1:
+        return len(moves)
+    nodes = 0
+    for move in moves:
+        undo = state.make_move(move)
+        nodes += perft(state, depth - 1, generator)
+        state.unmake_move(undo)
+    return nodes
+
+
+def divide(state, depth, generator=bitboard_moves):
+    # perft of depth - 1 after each move, to find where two generators split
+    output = {}
+    if game_over(state):
+        return output
+    for move in generator(state):
+        undo = state.make_move(move)
+        output[move] = perft(state, depth - 1, generator)
+        state.unmake_move(undo)
+    return output
+
+
+def perft_vector(state, depth, chunk_size=4096):
+    # perft with the batched kernel of bot/utils.py, a level of the tree at a
+    # time in chunks of chunk_size positions
+    import numpy as np
+    from bot.utils import legal_move_masks
+
+    def count(boards, turns, num_moves, depth):
+        if depth == 0:
+            return len(boards)
+        nodes = 0
+        for start in range(0, len(boards), chunk_size):
+            part = slice(start, start + chunk_size)
+            masks = legal_move_masks(boards[part], turns[part])
+            alive = (boards[part] == KING).any(axis=1) & (boards[part] == -KING).any(axis=1)
+            alive &= num_moves[part] < 100
+            masks[~alive] = False
+            if depth == 1:
+                nodes += int(masks.sum())
+                continue
+            rows, starts, ends = np.nonzero(masks)
+            children = boards[part][rows]
+            index = np.arange(len(rows))
+            pieces = children[index, starts]
+            promote = ((pieces == PAWN) & (ends < 6)) | ((pieces == -PAWN) & (ends >= 30))
+            children[index, ends] = np.where(promote, pieces * JOKER, pieces)
+            children[index, starts] = 0
+            nodes += count(children, -turns[part][rows], num_moves[part][rows] + 1, depth - 1)
+        return nodes
+
+    boards = np.array([to_cells(state)], dtype=np.int8)
+    turns = np.array([1 if state.turn == WHITE else -1], dtype=np.int8)
+    num_moves = np.array([state.num_moves], dtype=np.int16)
+    return count(boards, turns, num_moves, depth)
+
+
+def timed(function, *args):
+    # (result, seconds)
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def run(notation, depth, generators=None):
+    """
+    perft of one position with each generator (names of GENERATORS, or
+    "vector"). Returns {name: (nodes, seconds)}.
+    """
+    if generators is None:
+        generators = list(GENERATORS) + ["vector"]
+    output = {}
+    for name in generators:
+        state = from_notation(notation)
+        if name == "vector":
+            output[name] = timed(perft_vector, state, depth)
+        else:
+            output[name] = timed(perft, state, depth, GENERATORS[name])
+    return output
+
+
+def check(max_depth=3, generators=None, corpus=CORPUS):
+    """
+    Runs every corpus position to max_depth (or as deep as its counts go)
+    with each generator. Returns a list of (name, depth, generator, nodes,
+    seconds, expected) rows, expected being None past the recorded counts.
+    """
+    rows = []
+    for name, notation, counts in corpus:
+        for depth in range(1, max_depth + 1):
+            expected = counts[depth - 1] if depth <= len(counts) else None
+            for generator, (nodes, seconds) in run(notation, depth, generators).items():
+                rows.append((name, depth, generator, nodes, seconds, expected))
+    return rows
+
+
+def first_difference(notation, depth, generator, other="reference"):
+    # follows the divide counts of two generators down to the first position
+    # where they list different moves. Returns (notation, moves only in
+    # generator, moves only in other), or None if they agree
+    state = from_notation(notation)
+    while depth > 0:
+        mine = divide(state, depth, GENERATORS[generator])
+        theirs = divide(state, depth, GENERATORS[other])
+        if set(mine) != set(theirs):
+            return to_notation(state), sorted(set(mine) - set(theirs)), sorted(set(theirs) - set(mine))
+        split = [move for move in mine if mine[move] != theirs[move]]
+        if not split:
+            return None
+        state.make_move(split[0])
+        depth -= 1
+    return None
@@ -1,4 +1,22 @@
+# Scaled piece images, shared by every board and only loaded on first draw.
+# pygame is imported there too, the rules never need it
+_images = {}
+
+
+def load_image(name, size):
+    key = (name, size)
+    if key not in _images:
+        import pygame
+
+        img = pygame.image.load("data/imgs/" + name + ".png")
+        _images[key] = pygame.transform.scale(img, size)
+    return _images[key]
+
+
+# View of a piece in board.state, the rules live in GameState
 class Piece:
+    img_name = None
+
     def __init__(self, pos, color, board):
         self.pos = pos
         self.x = pos[0]
@@ -7,51 +25,29 @@ class Piece:
         self.has_moved = False
         self.has_promoted = False
         self.notation = None
+        self.img_size = (board.tile_width - 20, board.tile_height - 20)
+
+    @property
+    def img(self):
+        return load_image(self.color[0] + "_" + self.img_name, self.img_size)
+
     def get_notation(self):
         return self.notation
+
     def get_moves(self, board):
-        output = []
-        for direction in self.get_possible_moves(board):
-            for square in direction:
-                if square.occupying_piece is not None:
-                    if square.occupying_piece.color == self.color:
-                        break
-                    else:
-                        output.append(square)
-                        break
-                else:
-                    output.append(square)
-        return output
+        return [board.get_square_from_pos(pos) for pos in board.state.get_valid_moves(self.pos)]
 
     def get_valid_moves(self, board):
-        output = []
-        for square in self.get_moves(board):
-            output.append(square)
-        return output
+        return self.get_moves(board)
 
     def move(self, board, square, force=False):
         for i in board.squares:
             i.highlight = False
-        if square in self.get_valid_moves(board) or force:
-            prev_square = board.get_square_from_pos(self.pos)
-            self.pos, self.x, self.y = square.pos, square.x, square.y
-            if(self.get_notation() == ' ' and self.y == 0 and self.color == "white") or (self.get_notation() == ' ' and self.y == 5 and self.color == "black") and not self.has_promoted:
-                self.promote(self.color, board)
-                #print("Pawn has been promoted")
-
-            prev_square.occupying_piece = None
-            if square.occupying_piece is not None:
-                board.last_captured = 0
-            else:
-                board.last_captured += 1
-            square.occupying_piece = self
-            board.selected_piece = None
-            self.has_moved = True
-
+        board.selected_piece = None
+        if force or square.pos in board.state.get_valid_moves(self.pos):
+            board.state.apply_move((self.pos, square.pos))
             return True
-        else:
-            board.selected_piece = None
-            return False
+        return False
 
     # True for all pieces except pawn
     def attacking_squares(self, board):
@@ -1,5 +1,6 @@
 # /* Square.py
-import pygame
+# pygame is only imported once a square is drawn or its rect is used, so
+# boards can be built and played on machines without a display or pygame
 
 
 # Tile creator
@@ -19,7 +20,15 @@ class Square:
         self.occupying_piece = None
         self.coord = self.get_coord()
         self.highlight = False
-        self.rect = pygame.Rect(self.abs_x, self.abs_y, self.width, self.height)
+        self._rect = None
+
+    @property
+    def rect(self):
+        if self._rect is None:
+            import pygame
+
+            self._rect = pygame.Rect(self.abs_x, self.abs_y, self.width, self.height)
+        return self._rect
 
     # get the formal notation of the tile
     def get_coord(self):
@@ -27,6 +36,8 @@ class Square:
         return columns[self.x] + str(self.y + 1)
 
     def draw(self, display):
+        import pygame
+
         # configures if tile should be light or dark or highlighted tile
         if self.highlight:
             pygame.draw.rect(display, self.highlight_color, self.rect)
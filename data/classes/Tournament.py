@@ -0,0 +1,164 @@
+# /* Tournament.py
+# Double round-robin between the bots in data/classes/bots, scored as in
+# rules.md: every pair plays once with each colour, a win is worth 3 points, a
+# draw 1 and a loss 0. Ties are broken by Sonneborn-Berger, then the direct
+# encounter between the tied bots, then the number of wins, then at random.
+# Games are spread over a process pool, each worker imports every bot once.
+
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from data.classes.Match import load_bot, play_game
+
+BOTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bots")
+
+WIN_POINTS = 3
+DRAW_POINTS = 1
+
+# Bot classes of the worker process, filled by _init_worker
+_bots = {}
+
+
+def discover_bots():
+    # names of the modules in data/classes/bots that import and define a Bot
+    # class. A bot that fails to import is left out, like a submission that
+    # does not compile
+    names = []
+    for filename in sorted(os.listdir(BOTS_DIR)):
+        name, ext = os.path.splitext(filename)
+        if ext != ".py" or name.startswith("_"):
+            continue
+        try:
+            cls = load_bot(name)
+        except Exception:
+            continue
+        if isinstance(cls, type):
+            names.append(name)
+    return names
+
+
+def schedule(names, rounds=1, seed=None):
+    # (game number, white, black, seed) for every game, each pair meeting once
+    # with each colour per round
+    rng = random.Random(seed)
+    games = []
+    for _ in range(rounds):
+        for white in names:
+            for black in names:
+                if white != black:
+                    games.append((len(games) + 1, white, black, rng.getrandbits(32)))
+    return games
+
+
+def _init_worker(names):
+    for name in names:
+        _bots[name] = load_bot(name)
+
+
+def play_scheduled(game):
+    # runs in a worker: plays one scheduled game with fresh Bot instances
+    number, white, black, seed, time_limit = game
+    missing = [name for name in (white, black) if name not in _bots]
+    if missing:
+        _init_worker(missing)
+    rng = random.Random(seed)
+    # bots draw from the random module
+    random.seed(seed)
+    record = play_game(_bots[white](), _bots[black](), rng, time_limit)
+    record["game"] = number
+    record["white"] = white
+    record["black"] = black
+    return record
+
+
+def run(names=None, rounds=1, workers=None, seed=None, time_limit=None):
+    # plays the tournament and returns the game records in schedule order,
+    # time_limit is passed on to play_game
+    if names is None:
+        names = discover_bots()
+    games = [game + (time_limit,) for game in schedule(names, rounds, seed)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        _init_worker(names)
+        return [play_scheduled(game) for game in games]
+    # a few chunks per worker keeps them all busy until the end without
+    # paying the inter-process round trip for every game
+    chunksize = max(1, len(games) // (workers * 4))
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(names,)) as pool:
+        return list(pool.map(play_scheduled, games, chunksize=chunksize))
+
+
+def _points(record, name):
+    if record["result"] == "draw":
+        return DRAW_POINTS
+    return WIN_POINTS if record[record["result"]] == name else 0
+
+
+def standings(names, records, seed=None):
+    # one row per bot, best first. Each row has name, played, wins, draws,
+    # losses, score, sonneborn_berger, direct_encounter and rank
+    rows = {
+        name: {
+            "name": name,
+            "played": 0,
+            "wins": 0,
+            "draws": 0,
+            "losses": 0,
+            "score": 0,
+            "sonneborn_berger": 0.0,
+            "direct_encounter": 0,
+        }
+        for name in names
+    }
+    for record in records:
+        for name in (record["white"], record["black"]):
+            row = rows[name]
+            points = _points(record, name)
+            row["played"] += 1
+            row["score"] += points
+            if points == WIN_POINTS:
+                row["wins"] += 1
+            elif points == DRAW_POINTS:
+                row["draws"] += 1
+            else:
+                row["losses"] += 1
+
+    # Sonneborn-Berger: the final score of every opponent beaten, half the
+    # score of every opponent drawn, counted per game
+    for record in records:
+        for name, opponent in ((record["white"], record["black"]), (record["black"], record["white"])):
+            points = _points(record, name)
+            if points == WIN_POINTS:
+                rows[name]["sonneborn_berger"] += rows[opponent]["score"]
+            elif points == DRAW_POINTS:
+                rows[name]["sonneborn_berger"] += rows[opponent]["score"] / 2
+
+    # direct encounter: points scored in the games among the bots still tied
+    # on score and Sonneborn-Berger. In a round-robin all of them have met
+    groups = {}
+    for row in rows.values():
+        groups.setdefault((row["score"], row["sonneborn_berger"]), set()).add(row["name"])
+    for group in groups.values():
+        if len(group) < 2:
+            continue
+        for record in records:
+            if record["white"] in group and record["black"] in group:
+                for name in (record["white"], record["black"]):
+                    rows[name]["direct_encounter"] += _points(record, name)
+
+    rng = random.Random(seed)
+    order = sorted(
+        rows.values(),
+        key=lambda row: (
+            row["score"],
+            row["sonneborn_berger"],
+            row["direct_encounter"],
+            row["wins"],
+            rng.random(),
+        ),
+        reverse=True,
+    )
+    for rank, row in enumerate(order, 1):
+        row["rank"] = rank
+    return order
@@ -0,0 +1,100 @@
+# /* TranspositionTable.py
+# Fixed-size transposition table for the search bots, keyed by GameState's
+# Zobrist hash_key. Entries live in preallocated arrays, two per bucket: the
+# first slot keeps the deepest result (until a newer search replaces it), the
+# second is always overwritten.
+
+from array import array
+
+from data.classes.GameState import POSITIONS
+
+# bound types, 0 marks an empty slot
+EXACT = 1
+LOWER = 2
+UPPER = 3
+
+# key (8) + score (8) + move (2) + depth (1) + bound (1) + generation (1)
+ENTRY_BYTES = 21
+
+
+class TranspositionTable:
+    def __init__(self, size_mb=16):
+        # number of buckets is the largest power of two that fits size_mb
+        buckets = 1
+        while buckets * 4 * ENTRY_BYTES <= size_mb * 1024 * 1024:
+            buckets *= 2
+        self.mask = buckets - 1
+        self.size = buckets * 2
+        self.clear()
+
+    def new_search(self):
+        # entries from earlier searches stay usable, but the depth-preferred
+        # slot no longer protects them
+        self.generation = (self.generation + 1) & 0xFF
+
+    def clear(self):
+        # every slot back to empty, as a new table
+        size = self.size
+        self.keys = array("Q", bytes(8 * size))
+        self.scores = array("d", bytes(8 * size))
+        self.moves = array("h", bytes(2 * size))
+        self.depths = array("b", bytes(size))
+        self.bounds = array("B", bytes(size))
+        self.generations = array("B", bytes(size))
+        self.generation = 0
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+
+    def probe(self, key):
+        # (depth, score, bound, move) for key, or None. move is a
+        # ((x, y), (x, y)) tuple or None
+        self.probes += 1
+        slot = (key & self.mask) << 1
+        if self.keys[slot] != key or not self.bounds[slot]:
+            slot += 1
+            if self.keys[slot] != key or not self.bounds[slot]:
+                return None
+        self.hits += 1
+        move = self.moves[slot]
+        if move >= 0:
+            move = (POSITIONS[move // 36], POSITIONS[move % 36])
+        else:
+            move = None
+        return self.depths[slot], self.scores[slot], self.bounds[slot], move
+
+    def store(self, key, depth, score, bound, move=None):
+        slot = (key & self.mask) << 1
+        if (
+            self.keys[slot] != key
+            and self.bounds[slot]
+            and self.generations[slot] == self.generation
+            and self.depths[slot] > depth
+        ):
+            # the depth-preferred slot holds a deeper result from this search
+            slot += 1
+        self.stores += 1
+        self.keys[slot] = key
+        self.scores[slot] = score
+        if move is None:
+            self.moves[slot] = -1
+        else:
+            (fx, fy), (tx, ty) = move
+            self.moves[slot] = (fy * 6 + fx) * 36 + ty * 6 + tx
+        self.depths[slot] = depth
+        self.bounds[slot] = bound
+        self.generations[slot] = self.generation
+
+    def hit_rate(self):
+        return self.hits / self.probes if self.probes else 0.0
+
+    def stats(self):
+        used = sum(1 for bound in self.bounds if bound)
+        return {
+            "entries": self.size,
+            "used": used,
+            "probes": self.probes,
+            "hits": self.hits,
+            "hit_rate": self.hit_rate(),
+            "stores": self.stores,
+        }
@@ -1,130 +1,167 @@
-
-import copy
 import random
+import time
 
-import pygame
-
-
-
-def deepcopy_ignore_surfaces(obj, memo=None):
-    if memo is None:
-        memo = {}
-
-    if id(obj) in memo:
-        return memo[id(obj)]
-
-    if isinstance(obj, pygame.Surface):
-        return obj
+from data.classes.MoveOrdering import MoveOrderer
+from data.classes.TranspositionTable import TranspositionTable, EXACT, LOWER, UPPER
+from data.classes.bots.bot import PIECE_VALUES
+from data.classes.GameState import PIECE_LETTERS
 
-    if isinstance(obj, dict):
-        copied = {}
-        memo[id(obj)] = copied
-        for k, v in obj.items():
-            copied[deepcopy_ignore_surfaces(k, memo)] = deepcopy_ignore_surfaces(v, memo)
-        return copied
+# piece code -> material value, pawn 1 up to king 100
+SCORES = {}
+for _letter, _value in {"P": 1, "N": 3, "B": 3, "R": 5, "S": 5, "Q": 9, "J": 9, "K": 100}.items():
+    SCORES[PIECE_LETTERS[_letter]] = SCORES[-PIECE_LETTERS[_letter]] = _value
 
-    elif isinstance(obj, list):
-        copied = []
-        memo[id(obj)] = copied
-        for item in obj:
-            copied.append(deepcopy_ignore_surfaces(item, memo))
-        return copied
 
-    elif hasattr(obj, '__dict__'):
-        copied = obj.__class__.__new__(obj.__class__)
-        memo[id(obj)] = copied
-        for k, v in obj.__dict__.items():
-            setattr(copied, k, deepcopy_ignore_surfaces(v, memo))
-        return copied
-
-    else:
-        return copy.deepcopy(obj, memo)
-    
+class SearchTimeout(Exception):
+    pass
 
 
 class Bot:
     """
-    This is a sample minimax bot that uses the minimax algorithm to choose the best move.
-    It evaluates the board state and simulates moves to find the optimal one.
+    This is a sample minimax bot that searches with alpha-beta pruning and iterative deepening.
+    It searches one ply deeper at a time until its time budget runs out, and plays the best move
+    of the last depth it finished. The clock is checked while searching, so the bot answers within
+    time_limit seconds however deep it gets.
     This is a basic implementation and may not be optimal for all scenarios. 
-    You are responsible for testing and improving the bot's performance. We recommend using depth 1 at first.
+    You are responsible for testing and improving the bot's performance.
     We also recommend using a more advanced evaluation function for better performance.
     Warning: we have set a hard time limit of 0.1 second for the bot to make a move. If your bot takes 
-    longer than that, it will be terminated and our evaluation server will choose random moves. We have tested
-    the bot with different depths and it nearly always exceeds the time limit if the depth is greater than 2.
+    longer than that, it will be terminated and our evaluation server will choose random moves. Keep
+    time_limit below that with some margin for the machine you are evaluated on.
     """
-    def __init__(self):
-        self.depth = 1 ## Please set the depth <= 2 unless you are sure your bot runs within the time limit.
+    def __init__(self, tt_size_mb=16, time_limit=0.09, move_ordering=True):
+        self.depth = 64 # deepest iteration, the clock normally stops the search well before this
+        self.time_limit = time_limit
+        # kept for the whole game so later moves reuse earlier searches,
+        # self.tt.stats() reports the hit rate
+        self.tt = TranspositionTable(tt_size_mb)
+        # None searches moves in generation order, for comparing node counts
+        self.ordering = MoveOrderer(PIECE_VALUES) if move_ordering else None
+        self.nodes = 0
+        self.completed_depth = 0
+        self.deadline = 0.0
     
 
     def get_possible_moves(self, side, board):
         return board.get_all_valid_moves(side)
     
     def evaluate_board(self, side, board):
-        SCORES_DICT = {
-            " ": 1, # pawn
-            "N": 3, # knight
-            "B": 3, # bishop
-            "R": 5, # rook
-            "S": 5, # star
-            "Q": 9, # queen
-            "J": 9, # joker
-            "K": 100 # king
-        }
+        # material from side's point of view, read straight off the piece
+        # codes instead of the get_board_state() strings. The search passes
+        # GameStates, the bot itself a Board
         evaluation = 0
-        board_state = board.get_board_state()
-        for x in board_state:
-            for y in x:
-                if y != "":
-                    piece = y
-                    piece_value = SCORES_DICT[piece[1]]
-                    if piece[0] == 'b' and side == 'black':
-                        evaluation += piece_value
-                    elif piece[0] == 'w' and side == 'white':
-                        evaluation += piece_value
-                    else:
-                        evaluation -= piece_value
+        for code in getattr(board, "state", board).cells:
+            if code:
+                if (code > 0) == (side == 'white'):
+                    evaluation += SCORES[code]
+                else:
+                    evaluation -= SCORES[code]
         return evaluation
     
     def simulate_move(self, board, start_pos, end_pos):
-        new_board = deepcopy_ignore_surfaces(board)
-        new_board.handle_move(start_pos, end_pos)
+        new_board = board.clone()
+        new_board.apply_move((start_pos, end_pos))
         return new_board
     
-    def minimax(self, board, side, depth, maximizing_player):
-        if depth == 0 or board.is_in_checkmate(side):
-            return self.evaluate_board(side, board)
-
-        moves = board.get_all_valid_moves(side)
-        if maximizing_player:
-            max_eval = float('-inf')
-            for init_pos, end_pos in moves:
-                simulated_board = self.simulate_move(board, init_pos, end_pos)
-                eval = self.minimax(simulated_board, side, depth - 1, False)
-                max_eval = max(max_eval, eval)
-            return max_eval
+    def alphabeta(self, board, depth, alpha, beta, ply):
+        # negamax form, scores are from the point of view of the side to move
+        self.nodes += 1
+        if self.nodes & 15 == 0 and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+
+        turn = board.turn
+        if depth == 0 or board.is_in_checkmate("white") or board.is_in_checkmate("black"):
+            return self.evaluate_board(turn, board)
+
+        key = board.hash_key
+        entry = self.tt.probe(key)
+        tt_move = None
+        if entry is not None:
+            tt_depth, score, bound, tt_move = entry
+            if tt_depth >= depth:
+                if bound == EXACT:
+                    return score
+                if bound == LOWER and score >= beta:
+                    return score
+                if bound == UPPER and score <= alpha:
+                    return score
+
+        moves = board.get_all_valid_moves(turn)
+        if not moves:
+            return self.evaluate_board(turn, board)
+        if self.ordering is not None:
+            moves = self.ordering.order(board.cells, moves, ply, tt_move)
+        original_alpha = alpha
+        best_eval = float('-inf')
+        best_move = None
+        for move in moves:
+            undo = board.make_move(move)
+            eval = -self.alphabeta(board, depth - 1, -beta, -alpha, ply + 1)
+            board.unmake_move(undo)
+            if eval > best_eval:
+                best_eval = eval
+                best_move = move
+                if eval > alpha:
+                    alpha = eval
+                    if alpha >= beta:
+                        if self.ordering is not None:
+                            self.ordering.cutoff(board.cells, move, ply, depth)
+                        break
+
+        if best_eval <= original_alpha:
+            bound = UPPER
+        elif best_eval >= beta:
+            bound = LOWER
         else:
-            min_eval = float('inf')
-            for init_pos, end_pos in moves:
-                simulated_board = self.simulate_move(board, init_pos, end_pos)
-                eval = self.minimax(simulated_board, side, depth - 1, True)
-                min_eval = min(min_eval, eval)
-            return min_eval
-
-    def get_best_move_minimax(self, board, side, depth):
-        best_move = []
+            bound = EXACT
+        self.tt.store(key, depth, best_eval, bound, best_move)
+        return best_eval
+
+    def search_root(self, board, moves, depth):
+        # returns every move sharing the best score. Scores are whole numbers,
+        # so searching with alpha just below the best score so far still gives
+        # exact scores for moves that tie with it
+        best_moves = []
         best_value = float('-inf')
+        for move in moves:
+            undo = board.make_move(move)
+            value = -self.alphabeta(board, depth - 1, float('-inf'), -(best_value - 1), 1)
+            board.unmake_move(undo)
+            if value > best_value:
+                best_value = value
+                best_moves = [move]
+            elif value == best_value:
+                best_moves.append(move)
+        return best_moves, best_value
+
+    def get_best_move(self, board, side):
+        self.deadline = time.perf_counter() + self.time_limit
+        self.nodes = 0
+        self.completed_depth = 0
+        self.tt.new_search()
+        # the search runs on a copy of the bare GameState (Board only adds
+        # the rendering view), a timeout can leave it mid-line
+        board = getattr(board, "state", board).clone()
         moves = board.get_all_valid_moves(side)
-        for init_pos, end_pos in moves:
-            simulated_board = self.simulate_move(board, init_pos, end_pos)
-            move_value = self.minimax(simulated_board, side, depth - 1, False)
-            if move_value > best_value:
-                best_value = move_value
-                best_move = [(init_pos, end_pos)]
-            elif move_value == best_value:
-                best_move.append((init_pos, end_pos))
-        return best_move[0] if len(best_move) == 1 else random.choice(best_move)
-        
+        if not moves:
+            return None
+        if self.ordering is not None:
+            self.ordering.new_search()
+            moves = self.ordering.order(board.cells, moves, 0)
+        # played if not even depth 1 finishes in time
+        best_move = random.choice(moves)
+        for depth in range(1, self.depth + 1):
+            try:
+                best_moves, _ = self.search_root(board, moves, depth)
+            except SearchTimeout:
+                break
+            self.completed_depth = depth
+            best_move = best_moves[0] if len(best_moves) == 1 else random.choice(best_moves)
+            # search the last best move first next iteration
+            moves.remove(best_move)
+            moves.insert(0, best_move)
+        return best_move
+
     def move(self, side, board):
-        best_move = self.get_best_move_minimax(board, side, self.depth)
-        return best_move
\ No newline at end of file
+        best_move = self.get_best_move(board, side)
+        return best_move
@@ -1,96 +1,23 @@
-import pygame
-
 from data.classes.Piece import Piece
 
 class Pawn(Piece):
+    img_name = "pawn"
+
     def __init__(self, pos, color, board):
         super().__init__(pos, color, board)
         self.promoted = False
-        img_path = "data/imgs/" + color[0] + "_pawn.png"
-        self.img = pygame.image.load(img_path)
-        self.img = pygame.transform.scale(
-            self.img, (board.tile_width - 35, board.tile_height - 35)
-        )
+        self.img_size = (board.tile_width - 35, board.tile_height - 35)
         self.notation = " "
+
     def promote(self, color, board):
         self.promoted = True
-        self.img = pygame.image.load("data/imgs/" + color[0] + "_joker.png")
-        self.img = pygame.transform.scale(
-            self.img, (board.tile_width + 60, board.tile_height - 5)
-        )
+        self.img_name = "joker"
+        self.img_size = (board.tile_width + 60, board.tile_height - 5)
         self.notation = "J"
 
-    def get_possible_moves(self, board):
-        output = []
-        moves = []
-        # move forward
-        if self.color == "white":
-            moves.append((0, -1))
-            if not self.has_moved:
-                moves.append((0, -2))
-        elif self.color == "black":
-            moves.append((0, 1))
-            if not self.has_moved:
-                moves.append((0, 2))
-        for move in moves:
-            new_pos = (self.x, self.y + move[1])
-            if new_pos[1] < 6 and new_pos[1] >= 0:
-                output.append(board.get_square_from_pos(new_pos))
-        return output
-
-    def get_moves(self, board):
-        output = []
-
-        if self.promoted == True:
-            #print("This is joker moveset")
-            output = []
-            moves = [(1, 1), (-1, 1), (1, -1), (-1, -1), (2, 0), (-2, 0), (0, 2), (0, -2), (1, 0), (-1, 0), (0, 1), (0, -1), (2, 2), (-2, 2), (2, -2), (-2, -2)]
-            for move in moves:
-                new_pos = (self.x + move[0], self.y + move[1])
-                if (
-                    new_pos[0] < 6
-                    and new_pos[0] >= 0
-                    and new_pos[1] < 6
-                    and new_pos[1] >= 0
-                ):
-                    square = board.get_square_from_pos(new_pos)
-                    if square.occupying_piece == None or square.occupying_piece.color != self.color:
-                        output.append(square)
-            return output
-
-
-        for square in self.get_possible_moves(board):
-            if square.occupying_piece != None:
-                break
-            else:
-                output.append(square)
-        if self.color == "white":
-            if self.x + 1 < 6 and self.y - 1 >= 0:
-                square = board.get_square_from_pos((self.x + 1, self.y - 1))
-                if square.occupying_piece != None:
-                    if square.occupying_piece.color != self.color:
-                        output.append(square)
-            if self.x - 1 >= 0 and self.y - 1 >= 0:
-                square = board.get_square_from_pos((self.x - 1, self.y - 1))
-                if square.occupying_piece != None:
-                    if square.occupying_piece.color != self.color:
-                        output.append(square)
-        elif self.color == "black":
-            if self.x + 1 < 6 and self.y + 1 < 6:
-                square = board.get_square_from_pos((self.x + 1, self.y + 1))
-                if square.occupying_piece != None:
-                    if square.occupying_piece.color != self.color:
-                        output.append(square)
-            if self.x - 1 >= 0 and self.y + 1 < 6:
-                square = board.get_square_from_pos((self.x - 1, self.y + 1))
-                if square.occupying_piece != None:
-                    if square.occupying_piece.color != self.color:
-                        output.append(square)
-        return output
-
     def attacking_squares(self, board):
         if self.promoted == True:
-            return self.get_possible_moves(board)
+            return self.get_moves(board)
         # return the diagonal moves
         moves = self.get_moves(board)
         return [i for i in moves if i.x != self.x]
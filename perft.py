@@ -0,0 +1,48 @@
+import argparse
+
+from data.classes.Perft import CORPUS, GENERATORS, check, first_difference, run
+
+
+def print_rows(rows):
+    print(f"{'position':<14} {'depth':>5} {'generator':<10} {'nodes':>10} {'seconds':>8} {'nodes/s':>10}")
+    for name, depth, generator, nodes, seconds, expected in rows:
+        status = "" if expected is None or nodes == expected else f"  FAIL, expected {expected}"
+        rate = nodes / seconds if seconds > 0 else 0
+        print(f"{name:<14} {depth:>5} {generator:<10} {nodes:>10} {seconds:>8.3f} {rate:>10.0f}{status}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--depth", type=int, default=3, help="Number of moves to count to")
+    parser.add_argument("--position", type=str, default=None, help="Position in notation (default: every corpus position)")
+    parser.add_argument("--generators", type=str, nargs="*", default=None, help=f"Generators to run, of {', '.join(GENERATORS)}, vector (default: all)")
+    parser.add_argument("--divide", action="store_true", help="Show where each generator first disagrees with the reference")
+    args = parser.parse_args()
+
+    if args.position is not None:
+        corpus = [("position", args.position, ())]
+    else:
+        corpus = CORPUS
+    rows = check(args.depth, args.generators, corpus)
+    print_rows(rows)
+
+    # generators that disagree with each other or with a recorded count
+    failed = set()
+    for name, notation, counts in corpus:
+        for depth in range(1, args.depth + 1):
+            found = {row[2]: row[3] for row in rows if row[0] == name and row[1] == depth}
+            # without a recorded count the generators are checked against
+            # the reference, or the first one run
+            if depth <= len(counts):
+                expected = counts[depth - 1]
+            else:
+                expected = found.get("reference", next(iter(found.values()), None))
+            failed.update((name, notation, depth, generator) for generator, nodes in found.items() if expected is not None and nodes != expected)
+    if failed:
+        print(f"\n{len(failed)} counts are wrong")
+        if args.divide:
+            for name, notation, depth, generator in sorted(failed):
+                if generator in GENERATORS and generator != "reference":
+                    print(f"{name} depth {depth} {generator}: {first_difference(notation, depth, generator)}")
+        exit(1)
+    print("\nall counts agree")
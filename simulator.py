@@ -1,14 +1,28 @@
-import pygame
 import argparse
 import importlib
 
 from data.classes.Board import Board
+from data.classes.Match import (
+    TIME_LIMIT,
+    play_match,
+    game_latencies,
+    latency_report,
+    print_latencies,
+)
 
-pygame.init()
-
+pygame = None
+screen = None
 
 WINDOW_SIZE = (600, 600)
-screen = pygame.display.set_mode(WINDOW_SIZE)
+
+
+def init_display():
+    # the window is only opened when games are shown, --headless never
+    # touches pygame's display
+    global pygame, screen
+    import pygame
+    pygame.init()
+    screen = pygame.display.set_mode(WINDOW_SIZE)
 
 
 def draw(display, board):
@@ -57,12 +71,17 @@ def run_game(bot1_class, bot2_class, delay):
 # ... [rest of the code remains unchanged above] ...
 
 if __name__ == "__main__":
-    print("Made it this far 2")
     parser = argparse.ArgumentParser()
     parser.add_argument("--bot1", type=str, default="random_bot", help="Bot for black (e.g. 'random_bot')")
     parser.add_argument("--bot2", type=str, default="random_bot", help="Bot for white (e.g. 'random_bot')")
     parser.add_argument("--delay", type=int, default=0, help="Delay in ms between moves")
     parser.add_argument("--simulations", type=int, default=1, help="Number of simulations to run")
+    parser.add_argument("--headless", action="store_true", help="No window and no per-move output")
+    parser.add_argument("--quiet", action="store_true", help="With --headless, only print the totals")
+    parser.add_argument("--alternate", action="store_true", help="With --headless, swap colours every game")
+    parser.add_argument("--seed", type=int, default=None, help="With --headless, seed for reproducible games")
+    parser.add_argument("--enforce-time", action="store_true", help="With --headless, replace moves slower than --time-limit by random ones")
+    parser.add_argument("--time-limit", type=float, default=TIME_LIMIT, help="Time limit per move in seconds for --enforce-time")
     args = parser.parse_args()
 
     try:
@@ -74,6 +93,33 @@ if __name__ == "__main__":
         print(f"Error: Could not find bot module - {e}")
         exit()
 
+    if args.headless:
+        totals, games = play_match(
+            bot1_class,
+            bot2_class,
+            args.simulations,
+            alternate=args.alternate,
+            seed=args.seed,
+            log=None if args.quiet else print,
+            time_limit=args.time_limit if args.enforce_time else None,
+        )
+        total = args.simulations
+        moves = sum(game["moves"] for game in games)
+        seconds = sum(game["seconds"] for game in games)
+        replaced = sum(sum(game["replaced"].values()) for game in games)
+        late = sum(sum(game["late"].values()) for game in games)
+        colours = "alternating colours" if args.alternate else "bot1 black, bot2 white"
+        print(f"\n=== Headless Results: {args.bot1} vs {args.bot2} ({colours}) ===")
+        print(f"{args.bot1} (bot1) wins: {totals['bot1']} ({(totals['bot1'] / total) * 100:.1f}%)")
+        print(f"{args.bot2} (bot2) wins: {totals['bot2']} ({(totals['bot2'] / total) * 100:.1f}%)")
+        print(f"Draws: {totals['draw']} ({(totals['draw'] / total) * 100:.1f}%)")
+        print(f"{total} games, {moves} moves in {seconds:.2f}s, {replaced} moves replaced by random ones ({late} too slow)")
+        print()
+        print_latencies(latency_report(game_latencies(games)), [("bot1", args.bot1), ("bot2", args.bot2)])
+        exit()
+
+    init_display()
+
     bot1_wins = 0
     bot2_wins = 0
     draws = 0
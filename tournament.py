@@ -0,0 +1,51 @@
+import argparse
+import os
+import time
+
+from data.classes.Match import TIME_LIMIT, game_latencies, latency_report, print_latencies
+from data.classes.Tournament import discover_bots, run, standings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bots", type=str, nargs="*", default=None, help="Bot modules to enter (default: every bot in data/classes/bots)")
+    parser.add_argument("--rounds", type=int, default=1, help="Number of double round-robins to play")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Number of worker processes")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible games and tie-breaks")
+    parser.add_argument("--enforce-time", action="store_true", help="Replace moves slower than --time-limit by random ones")
+    parser.add_argument("--time-limit", type=float, default=TIME_LIMIT, help="Time limit per move in seconds for --enforce-time")
+    parser.add_argument("--quiet", action="store_true", help="Only print the standings")
+    args = parser.parse_args()
+
+    names = args.bots or discover_bots()
+    if len(names) < 2:
+        print("Error: a tournament needs at least two bots")
+        exit()
+
+    start = time.perf_counter()
+    time_limit = args.time_limit if args.enforce_time else None
+    records = run(names, args.rounds, args.workers, args.seed, time_limit)
+    wall = time.perf_counter() - start
+
+    if not args.quiet:
+        for record in records:
+            winner = "draw" if record["result"] == "draw" else record[record["result"]]
+            print(
+                f"game {record['game']}: {record['white']} (White) vs {record['black']} (Black): "
+                f"{winner} ({record['moves']} moves, {record['seconds']:.2f}s)"
+            )
+
+    print(f"\n=== Tournament Standings ({len(records)} games) ===")
+    print(f"{'#':>3} {'bot':<20} {'pts':>5} {'SB':>7} {'DE':>4} {'W':>4} {'D':>4} {'L':>4}")
+    for row in standings(names, records, args.seed):
+        print(
+            f"{row['rank']:>3} {row['name']:<20} {row['score']:>5} {row['sonneborn_berger']:>7.1f} "
+            f"{row['direct_encounter']:>4} {row['wins']:>4} {row['draws']:>4} {row['losses']:>4}"
+        )
+    late = sum(sum(record["late"].values()) for record in records)
+    if late:
+        print(f"\n{late} moves were over the {args.time_limit}s limit and replaced by random ones")
+    print()
+    print_latencies(latency_report(game_latencies(records)), [(name, name) for name in names])
+    cpu = sum(record["seconds"] for record in records)
+    print(f"\n{wall:.2f}s wall time, {cpu:.2f}s of games on {args.workers} workers")